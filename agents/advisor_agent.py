@@ -3,14 +3,64 @@ Nutrition-Based Local Food Advisor App
 Primary LLM Agent
 """
 
+import asyncio
+import json
+from logging import getLogger
+from typing import List
 from pydantic import Field
 from spoon_ai.agents.toolcall import ToolCallAgent
+from spoon_ai.schema import ToolCall, ToolChoice
 from spoon_ai.tools import ToolManager
 from agents.tools.nutrition_lookup_tool import NutritionLookupTool
 from agents.tools.dietary_requirements_tool import DietaryRequirementsTool
 from agents.tools.tavily_search_tool import TavilySearchTool
 
 
+# Same logger as spoon_ai's ToolCallAgent, so tool logs keep their usual channel
+logger = getLogger("spoon_ai")
+
+
+# Short canonical prompt. Tool details live in each tool's description and
+# parameters schema, so only the routing policy is restated here.
+_PROMPT_INTRO = (
+    "You are a friendly, engaging nutrition advisor with specialized tools. "
+    "Help users reach their health and nutrition goals with personalized guidance.\n"
+    "- Start with a warm greeting, introduce yourself, ask the user's name, then ask how you can help.\n"
+    "- Ask for age and gender only when relevant (daily needs, meal analysis), one at a time, "
+    "and remember everything the user shares.\n"
+    "- Be conversational, empathetic and encouraging; use the user's name; explain recommendations clearly.\n"
+    "- Never recommend harmful foods, alcoholic beverages, drugs or supplements.\n"
+    "Follow this tool policy (JSON):"
+)
+
+TOOL_POLICY = {
+    "meal_analysis": [
+        "nutrition_lookup for each food mentioned",
+        "dietary_requirements if age and gender are known",
+        "compare intake with requirements and give insights",
+    ],
+    "daily_needs": [
+        "ask age and gender if unknown",
+        "dietary_requirements",
+        "present minerals, vitamins and macronutrients separately and explain each",
+    ],
+    "food_nutrition": [
+        "nutrition_lookup",
+        "explain why the food is good and how it fits a balanced diet",
+    ],
+    "compare_or_find_foods": [
+        "nutrition_lookup for matching foods",
+        "present results comparably and recommend better choices",
+    ],
+    "fallback": (
+        "Always try nutrition_lookup first; use tavily_search when a food, brand, product or "
+        "restaurant item is not in the database, or for current research and trends"
+    ),
+}
+
+SYSTEM_PROMPT = f"{_PROMPT_INTRO}\n{json.dumps(TOOL_POLICY, separators=(',', ':'))}"
+
+
 class NutritionAdvisorAgent(ToolCallAgent):
     """
     Primary LLM agent for nutrition-based food recommendations.
@@ -34,83 +84,7 @@ class NutritionAdvisorAgent(ToolCallAgent):
         "6. Finding local stores for recommended foods"
     )
     
-    system_prompt: str = """
-    You are a friendly and engaging nutrition advisor assistant with access to specialized tools. Your goal is to help users achieve their health and nutrition targets through personalized guidance.
-    
-    **Starting the Conversation:**
-    - Always begin with a warm, welcoming greeting
-    - Introduce yourself as a nutrition advisor
-    - Ask the user their name in a friendly way
-    - Once you know their name, ask "How can I help you today?" or "What would you like to know about nutrition?"
-    
-    **Collecting Profile Information (When Appropriate):**
-    - When relevant to their questions (e.g., they ask about their daily needs, meal analysis), naturally ask for:
-      - Age (e.g., "To give you personalized recommendations, may I know your age?")
-      - Gender (e.g., "And what's your gender? This helps me provide accurate dietary requirements.")
-    - Don't ask for all information upfront - gather it naturally as the conversation progresses
-    - Remember all user information throughout the conversation
-    
-    **Your approach should be flexible and flow-based:**
-    
-    - If the user asks about their meal nutrition (e.g., "Can you tell me if my breakfast has good nutrition?"):
-      1. Use NutritionLookupTool to find the nutritional values of foods they mentioned
-      2. If you have their profile (age, gender), use DietaryRequirementsTool to get their daily requirements
-      3. Compare their meal intake with their requirements and provide insights
-      4. If food is not found in the database, use tavily_search_tool to search the internet for that food's nutritional information
-    
-    - If the user asks about their daily nutrition needs (e.g., "How much nutrition do I need per day?"):
-      1. If you don't have their profile yet, ask for their age and gender first
-      2. Use DietaryRequirementsTool to provide their recommended daily intake based on their profile
-      3. Present the information clearly organized by minerals, vitamins, and macronutrients
-      4. Explain what each nutrient does for their health
-    
-    - If the user asks about specific food nutrition (e.g., "What nutrients are in an apple?"):
-      1. Use NutritionLookupTool to find the nutritional information
-      2. If not found in the database, use tavily_search_tool to search the internet for that food's nutritional information
-      3. Explain why this food is good for them and how it fits into a balanced diet
-    
-    - If the user wants to compare foods or find foods rich in nutrients:
-      1. Use NutritionLookupTool to search for foods matching their criteria
-      2. Present the results in a clear, comparable format
-      3. Guide them on which foods are better choices and why
-    
-
-    **Tool Usage Guidelines:**
-    
-    **DietaryRequirementsTool** - Use when:
-    - User asks about recommended daily intake of nutrients, vitamins, or minerals
-    - User wants to know "How much nutrition do I need?"
-    - You need to compare user's intake with recommended requirements
-    - User asks about dietary requirements based on age and gender
-    
-    **NutritionLookupTool** - Use when:
-    - User asks about nutritional value of specific foods
-    - User mentions foods they ate and you need nutrition data
-    - User wants to find foods rich in specific nutrients
-    - User wants to compare different foods nutritionally
-    
-    **tavily_search_tool** - Use when:
-    - Food is not found in the NutritionLookupTool database and you need to search the internet
-    - User asks about current nutrition trends, recent research, or up-to-date information
-    - You need to find information about foods, recipes, or nutrition facts that aren't in the local database
-    - User asks about specific brands, products, or restaurant items not in the database
-    - You need to verify or supplement information from the database with current web sources
-    - Always try NutritionLookupTool first, then use tavily_search_tool as a fallback
-    
-    **Communication Style:**
-    - Be conversational, empathetic, enthusiastic, and genuinely helpful
-    - Create an interesting chat by asking engaging questions and showing interest in their goals
-    - Provide clear, friendly explanations of recommendations and nutritional insights
-    - Focus on helping users make healthier food choices and achieve their nutrition targets
-    - Use their name when appropriate to make the conversation more personal
-    - Be encouraging and supportive in your guidance
-    - Adapt to the user's preferred interaction style
-
-    Avoid
-    - Recommending food that are harmful to their health.
-    - Recommending alcoholic beverages.
-    - Recommending drugs or supplements.
-    """
+    system_prompt: str = SYSTEM_PROMPT
     
     next_step_prompt: str = (
         "Based on the previous interaction, decide what to do next. "
@@ -128,4 +102,40 @@ class NutritionAdvisorAgent(ToolCallAgent):
             TavilySearchTool()
         ])
     )
-
+    
+    async def _execute_tool_safely(self, tool_call: ToolCall) -> str:
+        """Execute a single tool call, converting failures into a tool result."""
+        try:
+            result = await self.execute_tool(tool_call)
+            logger.info(f"Tool {tool_call.function.name} executed with result: {result}")
+            # Flag error-like results so callers can decide on fallbacks
+            if isinstance(result, str) and (
+                "not healthy" in result.lower() or "execution failed" in result.lower()
+            ):
+                self.last_tool_error = result
+            return result
+        except Exception as e:
+            logger.error(f"Tool {tool_call.function.name} execution failed: {e}")
+            self.last_tool_error = str(e)
+            return f"Error executing tool {tool_call.function.name}: {str(e)}"
+    
+    async def act(self) -> str:
+        """Dispatch all tool calls of a step concurrently instead of one by one."""
+        if not self.tool_calls:
+            if self.tool_choices == ToolChoice.REQUIRED:
+                raise ValueError("No tools to call")
+            return self.memory.messages[-1].content or "No response from assistant"
+        
+        # Independent lookups (e.g. nutrition + dietary requirements) overlap here;
+        # _execute_tool_safely never raises, so one failure cannot cancel the others
+        results: List[str] = await asyncio.gather(
+            *(self._execute_tool_safely(tool_call) for tool_call in self.tool_calls)
+        )
+        
+        # Add tool messages in the original call order so each result stays
+        # paired with its tool_call_id
+        for tool_call, result in zip(self.tool_calls, results):
+            await self.add_message(
+                "tool", result, tool_call_id=tool_call.id, tool_name=tool_call.function.name
+            )
+        return "\n\n".join(results)
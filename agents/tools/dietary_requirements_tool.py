@@ -1,13 +1,71 @@
 """Dietary requirements lookup tool for querying minerals, vitamins, and nutrition recommendations."""
+import asyncio
 from spoon_ai.tools.base import BaseTool
 from data.dietary_vector_store import DietaryRequirementsVectorStore
 from data.process_dietary_data import get_age_group
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 from pydantic import PrivateAttr
 import re
 
 
+# Single-pass profile scan. Age patterns like "30-year-old", "age 30" or
+# "30 years old" are preferred; a bare number is only used as a fallback.
+# Word boundaries keep "female"/"woman" from matching "male"/"man".
+_PROFILE_PATTERN = re.compile(
+    r'(?P<age>\d+)[-\s]years?[-\s]old'
+    r'|\baged?[-\s](?P<prefixed_age>\d+)'
+    r'|\b(?P<number>\d+)\b'
+    r'|\b(?P<female>female|woman|girl)\b'
+    r'|\b(?P<male>male|man|boy)\b'
+)
+
+
+@lru_cache(maxsize=256)
+def _extract_profile(query: str) -> Tuple[Optional[int], Optional[str]]:
+    """Extract age and gender from query text in a single scan, memoized per query."""
+    age = None
+    fallback_age = None
+    gender = None
+    
+    for match in _PROFILE_PATTERN.finditer(query.lower()):
+        kind = match.lastgroup
+        if kind in ('male', 'female'):
+            gender = gender or kind
+            continue
+        
+        value = int(match.group(kind))
+        if not 1 <= value <= 120:  # Reasonable age range
+            continue
+        if kind == 'number':
+            fallback_age = fallback_age or value
+        else:
+            age = age or value
+    
+    return age or fallback_age, gender
+
+
+# Sections of an exact-match response, in display order
+_SECTION_HEADINGS = (
+    ('minerals', "\nMINERALS:"),
+    ('vitamins', "\nVITAMINS:"),
+    ('nutrition', "\nNUTRITION (Macronutrients):")
+)
+
+
+@lru_cache(maxsize=1)
+def get_default_vector_store() -> DietaryRequirementsVectorStore:
+    """Create the default dietary vector store once and share it across tool instances."""
+    data_dir = Path(__file__).parent.parent.parent / "data"
+    return DietaryRequirementsVectorStore(
+        data_dir / "dietary_vector_db",
+        mineral_path=data_dir / "mineral_requirements.json",
+        vitamin_path=data_dir / "vitamin_recommendations.json",
+        nutrition_path=data_dir / "nutrition_recommendations.json"
+    )
+
+
 class DietaryRequirementsTool(BaseTool):
     """Tool for looking up dietary requirements (minerals, vitamins, nutrition) by age and gender."""
     
@@ -54,18 +112,8 @@ class DietaryRequirementsTool(BaseTool):
     def __init__(self, vector_store: Optional[DietaryRequirementsVectorStore] = None, **kwargs):
         super().__init__(**kwargs)
         if vector_store is None:
-            # Initialize vector store if not provided
-            data_dir = Path(__file__).parent.parent.parent / "data"
-            vector_store_path = data_dir / "dietary_vector_db"
-            mineral_path = data_dir / "mineral_requirements.json"
-            vitamin_path = data_dir / "vitamin_recommendations.json"
-            nutrition_path = data_dir / "nutrition_recommendations.json"
-            self._vector_store = DietaryRequirementsVectorStore(
-                vector_store_path,
-                mineral_path=mineral_path,
-                vitamin_path=vitamin_path,
-                nutrition_path=nutrition_path
-            )
+            # Use the shared default vector store if not provided
+            self._vector_store = get_default_vector_store()
         else:
             self._vector_store = vector_store
     
@@ -74,51 +122,9 @@ class DietaryRequirementsTool(BaseTool):
         """Get the vector store instance."""
         if self._vector_store is None:
             # Lazy initialization if somehow not set
-            data_dir = Path(__file__).parent.parent.parent / "data"
-            vector_store_path = data_dir / "dietary_vector_db"
-            mineral_path = data_dir / "mineral_requirements.json"
-            vitamin_path = data_dir / "vitamin_recommendations.json"
-            nutrition_path = data_dir / "nutrition_recommendations.json"
-            self._vector_store = DietaryRequirementsVectorStore(
-                vector_store_path,
-                mineral_path=mineral_path,
-                vitamin_path=vitamin_path,
-                nutrition_path=nutrition_path
-            )
+            self._vector_store = get_default_vector_store()
         return self._vector_store
     
-    def _extract_age_from_query(self, query: str) -> Optional[int]:
-        """Extract age from query text."""
-        # Look for patterns like "30-year-old", "age 30", "30 years old", etc.
-        patterns = [
-            r'(\d+)[-\s]year[-\s]old',
-            r'age[-\s](\d+)',
-            r'aged[-\s](\d+)',
-            r'(\d+)[-\s]years[-\s]old',
-            r'\b(\d+)\b'  # Any number (less precise, use as fallback)
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, query.lower())
-            if match:
-                try:
-                    age = int(match.group(1))
-                    if 1 <= age <= 120:  # Reasonable age range
-                        return age
-                except (ValueError, IndexError):
-                    continue
-        
-        return None
-    
-    def _extract_gender_from_query(self, query: str) -> Optional[str]:
-        """Extract gender from query text."""
-        query_lower = query.lower()
-        if 'male' in query_lower or 'man' in query_lower or 'boy' in query_lower:
-            return "male"
-        elif 'female' in query_lower or 'woman' in query_lower or 'girl' in query_lower:
-            return "female"
-        return None
-    
     def _format_nutrient_value(self, value, key: str) -> str:
         """Format nutrient value for display."""
         if value is None:
@@ -132,7 +138,7 @@ class DietaryRequirementsTool(BaseTool):
         
         # Extract unit from key
         if '_' in key:
-            unit = key.split('_')[-1]
+            unit = key.rpartition('_')[2]
             return f"{value} {unit}"
         return str(value)
     
@@ -144,24 +150,34 @@ class DietaryRequirementsTool(BaseTool):
         max_results: int = 5
     ) -> str:
         """Execute the dietary requirements lookup."""
+        # Embedding and lookups are CPU/disk bound, so run them off the event loop
+        return await asyncio.to_thread(self._execute_sync, query, age, gender, max_results)
+    
+    def _execute_sync(
+        self,
+        query: str,
+        age: Optional[int],
+        gender: Optional[str],
+        max_results: int
+    ) -> str:
+        """Run the dietary requirements lookup synchronously."""
         try:
             # Validate max_results
             max_results = min(max(1, max_results), 10)
             
             # Extract age and gender from query if not provided
-            if age is None:
-                age = self._extract_age_from_query(query)
-            if gender is None:
-                gender = self._extract_gender_from_query(query)
+            if age is None or gender is None:
+                extracted_age, extracted_gender = _extract_profile(query)
+                if age is None:
+                    age = extracted_age
+                if gender is None:
+                    gender = extracted_gender
             
             # Try exact match first if we have both age and gender
             exact_match = None
             if age and gender:
                 age_group = get_age_group(age)
-                exact_match = self.vector_store.get_requirements_by_key(age_group, gender)
-            
-            # Perform semantic search
-            results = self.vector_store.search(query, n_results=max_results)
+                exact_match = self.vector_store.get_requirements_by_key(age_group, gender.lower())
             
             # If we have exact match, prioritize it
             if exact_match:
@@ -170,33 +186,19 @@ class DietaryRequirementsTool(BaseTool):
                     f"Dietary Requirements for {gender.capitalize()}, Age {age} (Age Group: {exact_match['age_group']})\n"
                 ]
                 
-                # Format minerals
-                if exact_match['minerals']:
-                    response_parts.append("\nMINERALS:")
-                    for key, value in exact_match['minerals'].items():
-                        formatted_value = self._format_nutrient_value(value, key)
-                        nutrient_name = key.replace('_', ' ').title()
-                        response_parts.append(f"  - {nutrient_name}: {formatted_value}")
-                
-                # Format vitamins
-                if exact_match['vitamins']:
-                    response_parts.append("\nVITAMINS:")
-                    for key, value in exact_match['vitamins'].items():
-                        formatted_value = self._format_nutrient_value(value, key)
-                        nutrient_name = key.replace('_', ' ').title()
-                        response_parts.append(f"  - {nutrient_name}: {formatted_value}")
-                
-                # Format nutrition
-                if exact_match['nutrition']:
-                    response_parts.append("\nNUTRITION (Macronutrients):")
-                    for key, value in exact_match['nutrition'].items():
-                        formatted_value = self._format_nutrient_value(value, key)
-                        nutrient_name = key.replace('_', ' ').title()
-                        response_parts.append(f"  - {nutrient_name}: {formatted_value}")
+                # Format minerals, vitamins and nutrition using precomputed labels
+                display = exact_match['display']
+                for section, heading in _SECTION_HEADINGS:
+                    if display[section]:
+                        response_parts.append(heading)
+                        for key, nutrient_name, value in display[section]:
+                            formatted_value = self._format_nutrient_value(value, key)
+                            response_parts.append(f"  - {nutrient_name}: {formatted_value}")
                 
                 return "\n".join(response_parts)
             
-            # Fallback to semantic search results
+            # Fall back to semantic search only when there is no exact match
+            results = self.vector_store.search(query, n_results=max_results)
             if not results:
                 return f"No dietary requirements found for '{query}'. Try specifying age and gender (e.g., 'requirements for 30-year-old male')."
             
@@ -204,24 +206,23 @@ class DietaryRequirementsTool(BaseTool):
             response_parts = [f"Found {len(results)} result(s) for '{query}':\n"]
             
             for i, result in enumerate(results, 1):
-                metadata = result['metadata']
-                age_group = metadata.get('age_group', 'Unknown')
-                gender_result = metadata.get('gender', 'Unknown')
-                
-                # Try to get full data
-                full_data = self.vector_store.get_requirements_by_key(age_group, gender_result)
+                age_group = result['metadata'].get('age_group', 'Unknown')
+                gender_result = result['metadata'].get('gender', 'Unknown')
+                # Each lookup is a single dict hit on the store's merged requirements
+                full_data = self.vector_store.get_requirements_by_key(age_group, gender_result.lower())
                 
                 if full_data:
                     response_parts.append(f"\n{i}. {gender_result.capitalize()}, Age Group: {age_group}")
                     
                     # Add summary of key nutrients
-                    if full_data['minerals']:
-                        key_minerals = list(full_data['minerals'].keys())[:3]
-                        response_parts.append(f"   Key Minerals: {', '.join([k.replace('_', ' ').title() for k in key_minerals])}")
+                    display = full_data['display']
+                    if display['minerals']:
+                        key_minerals = [label for _, label, _ in display['minerals'][:3]]
+                        response_parts.append(f"   Key Minerals: {', '.join(key_minerals)}")
                     
-                    if full_data['vitamins']:
-                        key_vitamins = list(full_data['vitamins'].keys())[:3]
-                        response_parts.append(f"   Key Vitamins: {', '.join([k.replace('_', ' ').title() for k in key_vitamins])}")
+                    if display['vitamins']:
+                        key_vitamins = [label for _, label, _ in display['vitamins'][:3]]
+                        response_parts.append(f"   Key Vitamins: {', '.join(key_vitamins)}")
                 else:
                     response_parts.append(f"\n{i}. {gender_result.capitalize()}, Age Group: {age_group}")
             
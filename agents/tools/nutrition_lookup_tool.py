@@ -1,11 +1,60 @@
 """Nutrition lookup tool for querying USDA FoodData Central database."""
+import asyncio
+import threading
 from spoon_ai.tools.base import BaseTool
 from data.vector_store import NutritionVectorStore
+from data.semantic_cache import SemanticQueryCache, normalize_query
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from pydantic import PrivateAttr
 
 
+# Important nutrients to display first, mapped from USDA name to display name
+IMPORTANT_NUTRIENTS = {
+    'Energy': 'Calories',
+    'Protein': 'Protein',
+    'Total lipid (fat)': 'Fat',
+    'Carbohydrate, by difference': 'Carbs',
+    'Fiber, total dietary': 'Fiber',
+    'Calcium, Ca': 'Calcium',
+    'Iron, Fe': 'Iron',
+    'Vitamin C, total ascorbic acid': 'Vitamin C',
+    'Sodium, Na': 'Sodium',
+    'Sugars, total including NLEA': 'Sugars'
+}
+
+# Number of non-priority nutrients added after the important ones
+MAX_EXTRA_NUTRIENTS = 5
+
+# Cosine distance lead of the top hit over the runner-up that makes a short result list enough
+ADAPTIVE_SEARCH_MARGIN = 0.075
+
+# Response header, rendered per call so a cached body is shown under the current query
+_response_header_template = "Found {count} result(s) for '{query}':\n".format
+
+# Per-hit response chunk; each starts with its own separator for "".join
+_format_hit_template = (
+    "\n\n{i}. {description}\n"
+    "   Category: {category}\n"
+    "   Key Nutrients: {nutrients}\n"
+).format_map
+
+# Maximum number of formatted food summaries kept in memory
+SUMMARY_CACHE_SIZE = 8192
+
+_DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+_JSON_PATH = _DATA_DIR / "FoodData_Central_foundation_food_json_2025-04-24.json"
+
+
+@lru_cache(maxsize=1)
+def get_default_vector_store() -> NutritionVectorStore:
+    """Create the default nutrition vector store once and share it across tool instances."""
+    return NutritionVectorStore(_DATA_DIR / "vector_db", json_path=_JSON_PATH)
+
+
 class NutritionLookupTool(BaseTool):
     """Tool for looking up nutritional information from USDA FoodData Central."""
     
@@ -36,15 +85,15 @@ class NutritionLookupTool(BaseTool):
     
     # Use PrivateAttr for internal implementation details
     _vector_store: Optional[NutritionVectorStore] = PrivateAttr(default=None)
+    _query_cache: SemanticQueryCache = PrivateAttr(default_factory=SemanticQueryCache)
+    _summary_cache: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _summary_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)  # Lookups run in worker threads
     
     def __init__(self, vector_store: Optional[NutritionVectorStore] = None, **kwargs):
         super().__init__(**kwargs)
         if vector_store is None:
-            # Initialize vector store if not provided
-            data_dir = Path(__file__).parent.parent.parent / "data"
-            vector_store_path = data_dir / "vector_db"
-            json_path = data_dir / "FoodData_Central_foundation_food_json_2025-04-24.json"
-            self._vector_store = NutritionVectorStore(vector_store_path, json_path=json_path)
+            # Use the shared default vector store if not provided
+            self._vector_store = get_default_vector_store()
         else:
             self._vector_store = vector_store
     
@@ -53,82 +102,127 @@ class NutritionLookupTool(BaseTool):
         """Get the vector store instance."""
         if self._vector_store is None:
             # Lazy initialization if somehow not set
-            data_dir = Path(__file__).parent.parent.parent / "data"
-            vector_store_path = data_dir / "vector_db"
-            json_path = data_dir / "FoodData_Central_foundation_food_json_2025-04-24.json"
-            self._vector_store = NutritionVectorStore(vector_store_path, json_path=json_path)
+            self._vector_store = get_default_vector_store()
         return self._vector_store
     
+    def _format_hit(self, metadata: Dict, full_data: Optional[Dict]) -> Tuple[str, str, str]:
+        """Return (description, category, key nutrients) for a search hit, cached by FDC ID."""
+        fdc_id = metadata.get('fdc_id')
+        with self._summary_lock:
+            if fdc_id in self._summary_cache:
+                self._summary_cache.move_to_end(fdc_id)
+                return self._summary_cache[fdc_id]
+        
+        # Extract key nutrients
+        nutrients = full_data.get('foodNutrients', []) if full_data else []
+        
+        # Single pass: bucket nutrients into important ones and a few extras, both by name.
+        # Records can repeat a nutrient (Energy is listed in kJ, then kcal); the
+        # last entry wins, so the whole list is scanned
+        important_hits = {}
+        extras = {}
+        for nutrient in nutrients:
+            info = nutrient.get('nutrient', {})
+            name = info.get('name', '')
+            amount = nutrient.get('amount')
+            if not name or amount is None or amount == 0:
+                continue
+            if name in IMPORTANT_NUTRIENTS:
+                important_hits[name] = f"{IMPORTANT_NUTRIENTS[name]}: {amount} {info.get('unitName', '')}"
+            elif name in extras or len(extras) < MAX_EXTRA_NUTRIENTS:
+                extras[name] = f"{name}: {amount} {info.get('unitName', '')}"
+        
+        # Important nutrients first (in priority order), then extras if space
+        key_nutrients = chain(
+            (important_hits[name] for name in IMPORTANT_NUTRIENTS if name in important_hits),
+            extras.values()
+        )
+        
+        summary = (
+            metadata.get('description', 'Unknown'),
+            metadata.get('category', 'Unknown category'),
+            ', '.join(islice(key_nutrients, 8))
+        )
+        
+        # Only cache hits that resolved to a food record
+        if full_data:
+            with self._summary_lock:
+                self._summary_cache[fdc_id] = summary
+                if len(self._summary_cache) > SUMMARY_CACHE_SIZE:
+                    self._summary_cache.popitem(last=False)
+        return summary
+    
     async def execute(self, food_query: str, max_results: int = 5) -> str:
         """Execute the nutrition lookup."""
+        # Embedding, search and record parsing are CPU/disk bound, so run them off the event loop
+        return await asyncio.to_thread(self._execute_sync, food_query, max_results)
+    
+    def _execute_sync(self, food_query: str, max_results: int) -> str:
+        """Run the nutrition lookup synchronously."""
         try:
             # Validate max_results
             max_results = min(max(1, max_results), 20)
             
+            # Identical queries after normalization hit before any embedding work
+            normalized_query = normalize_query(food_query)
+            # Cached values are (hit count, hit body); the header always names this query
+            cached_response = self._query_cache.get_exact(normalized_query, tag=max_results)
+            if cached_response is not None:
+                count, body = cached_response
+                return _response_header_template(count=count, query=food_query) + body
+            
+            # Near-duplicate queries ("apple", "apples") reuse the cached response
+            query_embedding = self.vector_store.embed_query(normalized_query)
+            cached_response = self._query_cache.get(query_embedding, tag=max_results)
+            if cached_response is not None:
+                count, body = cached_response
+                return _response_header_template(count=count, query=food_query) + body
+            
             # Search vector store
-            results = self.vector_store.search(food_query, n_results=max_results)
+            # Documents aren't needed; hits are formatted from the full food record
+            results = self.vector_store.search(
+                normalized_query,
+                n_results=max_results,
+                query_embedding=query_embedding,
+                include_documents=False,
+                margin_threshold=ADAPTIVE_SEARCH_MARGIN
+            )
             
             if not results:
                 return f"No nutritional information found for '{food_query}'. Try a different search term."
             
-            # Format response
-            response_parts = [f"Found {len(results)} result(s) for '{food_query}':\n"]
+            # Format response: one preallocated chunk per hit, each starting
+            # with its own separator so a single "".join builds the response
+            response_parts = [None] * (1 + len(results))
+            response_parts[0] = _response_header_template(count=len(results), query=food_query)
+            
+            # Load full data for all uncached hits in one call
+            missing_ids = [
+                result['metadata'].get('fdc_id') for result in results
+                if result['metadata'].get('fdc_id') and result['metadata'].get('fdc_id') not in self._summary_cache
+            ]
+            full_data_by_id = self.vector_store.get_foods_by_ids(missing_ids) if missing_ids else {}
             
             for i, result in enumerate(results, 1):
                 metadata = result['metadata']
-                fdc_id = metadata.get('fdc_id')
-                
-                # Load full data using FDC ID
-                full_data = self.vector_store.get_food_by_id(fdc_id) if fdc_id else {}
-                
-                # Extract key nutrients
-                nutrients = full_data.get('foodNutrients', []) if full_data else []
-                
-                # Prioritize important nutrients for display
-                important_nutrients = {
-                    'Energy': 'Calories',
-                    'Protein': 'Protein',
-                    'Total lipid (fat)': 'Fat',
-                    'Carbohydrate, by difference': 'Carbs',
-                    'Fiber, total dietary': 'Fiber',
-                    'Calcium, Ca': 'Calcium',
-                    'Iron, Fe': 'Iron',
-                    'Vitamin C, total ascorbic acid': 'Vitamin C',
-                    'Sodium, Na': 'Sodium',
-                    'Sugars, total including NLEA': 'Sugars'
-                }
-                
-                key_nutrients = []
-                nutrient_map = {}
-                
-                # Build nutrient map
-                for nutrient in nutrients:
-                    name = nutrient.get('nutrient', {}).get('name', '')
-                    amount = nutrient.get('amount')
-                    unit = nutrient.get('nutrient', {}).get('unitName', '')
-                    if amount is not None and amount != 0 and name:
-                        nutrient_map[name] = (amount, unit)
-                
-                # Add important nutrients first
-                for usda_name, display_name in important_nutrients.items():
-                    if usda_name in nutrient_map:
-                        amount, unit = nutrient_map[usda_name]
-                        key_nutrients.append(f"{display_name}: {amount} {unit}")
-                
-                # Add a few more nutrients if space
-                for name, (amount, unit) in list(nutrient_map.items())[:5]:
-                    if name not in important_nutrients:
-                        key_nutrients.append(f"{name}: {amount} {unit}")
-                
-                category = metadata.get('category', 'Unknown category')
-                
-                response_parts.append(
-                    f"\n{i}. {metadata.get('description', 'Unknown')}\n"
-                    f"   Category: {category}\n"
-                    f"   Key Nutrients: {', '.join(key_nutrients[:8])}\n"
+                description, category, key_nutrients = self._format_hit(
+                    metadata, full_data_by_id.get(metadata.get('fdc_id'))
                 )
+                response_parts[i] = _format_hit_template({
+                    'i': i,
+                    'description': description,
+                    'category': category,
+                    'nutrients': key_nutrients
+                })
             
-            return "\n".join(response_parts)
+            # Cache only the hits; the header carries this caller's wording of the query
+            self._query_cache.put(
+                query_embedding,
+                (len(results), "".join(response_parts[1:])),
+                tag=max_results,
+                text=normalized_query
+            )
+            return "".join(response_parts)
             
         except Exception as e:
             return f"Error looking up nutrition information: {str(e)}"
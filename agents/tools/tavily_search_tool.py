@@ -1,9 +1,15 @@
 """Tavily web search tool using the Python SDK."""
+import asyncio
 from typing import Optional
 from spoon_ai.tools.base import BaseTool
 from pydantic import PrivateAttr
 from tavily import TavilyClient
 from config import AppConfig
+from data.response_cache import ResponseCache, get_default_response_cache
+
+
+# How long formatted Tavily responses are reused (seconds)
+TAVILY_CACHE_TTL = 3600
 
 
 class TavilySearchTool(BaseTool):
@@ -41,13 +47,15 @@ class TavilySearchTool(BaseTool):
     
     # Use PrivateAttr for internal implementation details
     _client: Optional[TavilyClient] = PrivateAttr(default=None)
+    _cache: Optional[ResponseCache] = PrivateAttr(default=None)
     
-    def __init__(self, api_key: Optional[str] = None, **kwargs):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[ResponseCache] = None, **kwargs):
         super().__init__(**kwargs)
         api_key = api_key or AppConfig.TAVILY_API_KEY
         if not api_key:
             raise ValueError("TAVILY_API_KEY is required. Set it in your .env file or pass it as api_key parameter.")
         self._client = TavilyClient(api_key=api_key)
+        self._cache = cache or get_default_response_cache()
     
     @property
     def client(self) -> TavilyClient:
@@ -59,6 +67,21 @@ class TavilySearchTool(BaseTool):
             self._client = TavilyClient(api_key=api_key)
         return self._client
     
+    @staticmethod
+    def _format_result(index: int, result: dict) -> str:
+        """Format a single search result as one block of text."""
+        block = (
+            f"\n--- Result {index} ---\n"
+            f"Title: {result.get('title', 'No title')}\n"
+            f"URL: {result.get('url', '')}"
+        )
+        content = result.get('content', '')
+        if content:
+            # Truncate content if too long
+            content_preview = content[:500] + "..." if len(content) > 500 else content
+            block += f"\nContent: {content_preview}"
+        return block
+    
     async def execute(self, query: str, max_results: int = 5) -> str:
         """Execute the web search using Tavily."""
         try:
@@ -68,35 +91,37 @@ class TavilySearchTool(BaseTool):
             
             max_results = min(max(1, max_results), 10)
             
-            # Perform the search
-            response = self.client.search(
-                query=query.strip(),
-                max_results=max_results
+            # Identical searches reuse the cached formatted response
+            formatted_response = await self._cache.cached_get(
+                ResponseCache.make_key("tavily", query.strip(), max_results),
+                ttl=TAVILY_CACHE_TTL,
+                fetch=lambda: self._search(query, max_results)
             )
-            
-            # Format the response
-            results = response.get('results', [])
-            if not results:
+            if formatted_response is None:
                 return f"No results found for query: '{query}'. Try rephrasing your search."
-            
-            # Build formatted response
-            response_parts = [f"Found {len(results)} result(s) for '{query}':\n"]
-            
-            for i, result in enumerate(results, 1):
-                title = result.get('title', 'No title')
-                url = result.get('url', '')
-                content = result.get('content', '')
-                
-                response_parts.append(f"\n--- Result {i} ---")
-                response_parts.append(f"Title: {title}")
-                response_parts.append(f"URL: {url}")
-                if content:
-                    # Truncate content if too long
-                    content_preview = content[:500] + "..." if len(content) > 500 else content
-                    response_parts.append(f"Content: {content_preview}")
-            
-            formatted_response = "\n".join(response_parts)
             return formatted_response
             
         except Exception as e:
             return f"Error: Tavily search failed: {str(e)}"
+    
+    async def _search(self, query: str, max_results: int) -> Optional[str]:
+        """Search Tavily and format the results, or return None if nothing was found."""
+        # Perform the search in a worker thread so the blocking HTTP call
+        # doesn't stall other tool calls on the event loop
+        response = await asyncio.to_thread(
+            self.client.search,
+            query=query.strip(),
+            max_results=max_results
+        )
+        
+        # Format the response
+        results = response.get('results', [])
+        if not results:
+            return None
+        
+        # Build formatted response: one preformatted chunk per result
+        response_parts = [f"Found {len(results)} result(s) for '{query}':\n"]
+        response_parts.extend(
+            self._format_result(i, result) for i, result in enumerate(results, 1)
+        )
+        return "\n".join(response_parts)
@@ -3,6 +3,8 @@ Configuration module for Nutrition-Based Local Food Advisor App
 """
 
 import os
+from dataclasses import dataclass
+from functools import cache
 from typing import Optional
 
 from dotenv import load_dotenv
@@ -11,14 +13,21 @@ from dotenv import load_dotenv
 load_dotenv(override=True)
 
 
-class AppConfig:
-    """Application configuration settings"""
+# Project data directory
+_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+# eq=False keeps identity hashing, so the memoized get_summary lookup is cheap
+@dataclass(frozen=True, slots=True, eq=False)
+class _AppConfig:
+    """Application configuration settings (immutable, read from the environment once)"""
     
     # LLM Configuration
     DEFAULT_LLM_PROVIDER: str = os.getenv("DEFAULT_LLM_PROVIDER", "openai")  # Default LLM provider
     DEFAULT_LLM_API_KEY: Optional[str] = os.getenv("DEFAULT_LLM_API_KEY") or os.getenv("OPENAI_API_KEY")  # Default LLM API key
     DEFAULT_LLM_TEMPERATURE: float = float(os.getenv("DEFAULT_LLM_TEMPERATURE", "0.7"))  # Default LLM temperature
     DEFAULT_LLM_MODEL: str = os.getenv("DEFAULT_LLM_MODEL", "gpt-4o-mini")  # Default LLM model
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # Chat turns run at once by the web API
     
     # Agent Configuration
     AGENT_NAME: str = "Nutrition Advisor"
@@ -28,11 +37,11 @@ class AppConfig:
     )
     
     # Data Paths
-    DATA_DIR: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+    DATA_DIR: str = _DATA_DIR
     
     # Memory Configuration
     MEMORY_ENABLED: bool = True
-    MEMORY_STORAGE_PATH: Optional[str] = os.path.join(DATA_DIR, "user_memory.json")
+    MEMORY_STORAGE_PATH: Optional[str] = os.path.join(_DATA_DIR, "user_memory.json")
     
     # Local Store Search Configuration
     GOOGLE_API_KEY: Optional[str] = os.getenv("GOOGLE_API_KEY")
@@ -43,12 +52,12 @@ class AppConfig:
     ELEVENLABS_VOICE_ID: Optional[str] = os.getenv("ELEVENLABS_VOICE_ID")
     ELEVENLABS_OUTPUT_FORMAT: Optional[str] = os.getenv("ELEVENLABS_OUTPUT_FORMAT")
     ELEVENLABS_MODEL_ID: Optional[str] = os.getenv("ELEVENLABS_MODEL_ID")
+    ELEVENLABS_MAX_CONCURRENCY: int = int(os.getenv("ELEVENLABS_MAX_CONCURRENCY", "2"))  # Plan's concurrent request limit
     
     # Tavily Search Configuration
     TAVILY_API_KEY: Optional[str] = os.getenv("TAVILY_API_KEY")
     
-    @classmethod
-    def validate(cls) -> bool:
+    def validate(self) -> bool:
         """
         Validate that required configuration is present.
         
@@ -59,8 +68,8 @@ class AppConfig:
         # They will be required when specific features (LLM calls, Google search) are used
         return True
     
-    @classmethod
-    def get_summary(cls) -> str:
+    @cache
+    def get_summary(self) -> str:
         """
         Get a summary of current configuration.
         
@@ -69,17 +78,19 @@ class AppConfig:
         """
         return f"""
 Configuration Summary:
-  - Agent Name: {cls.AGENT_NAME}
-  - Default LLM Provider: {cls.DEFAULT_LLM_PROVIDER}
-  - Default LLM Model: {cls.DEFAULT_LLM_MODEL}
-  - Default LLM API Key: {'Set' if cls.DEFAULT_LLM_API_KEY else 'Not set'}
-  - Data Directory: {cls.DATA_DIR}
-  - Memory Enabled: {cls.MEMORY_ENABLED}
-  - Google API Key: {'Set' if cls.GOOGLE_API_KEY else 'Not set'}
-  - ElevenLabs API Key: {'Set' if cls.ELEVENLABS_API_KEY else 'Not set'}
-  - ElevenLabs Voice ID: {'Set' if cls.ELEVENLABS_VOICE_ID else 'Not set'}
-  - ElevenLabs Output Format: {'Set' if cls.ELEVENLABS_OUTPUT_FORMAT else 'Not set'}
-  - ElevenLabs Model ID: {'Set' if cls.ELEVENLABS_MODEL_ID else 'Not set'}
-  - Tavily API Key: {'Set' if cls.TAVILY_API_KEY else 'Not set'}
+  - Agent Name: {self.AGENT_NAME}
+  - Default LLM Provider: {self.DEFAULT_LLM_PROVIDER}
+  - Default LLM Model: {self.DEFAULT_LLM_MODEL}
+  - Default LLM API Key: {'Set' if self.DEFAULT_LLM_API_KEY else 'Not set'}
+  - Data Directory: {self.DATA_DIR}
+  - Memory Enabled: {self.MEMORY_ENABLED}
+  - Google API Key: {'Set' if self.GOOGLE_API_KEY else 'Not set'}
+  - ElevenLabs API Key: {'Set' if self.ELEVENLABS_API_KEY else 'Not set'}
+  - ElevenLabs Voice ID: {'Set' if self.ELEVENLABS_VOICE_ID else 'Not set'}
+  - ElevenLabs Output Format: {'Set' if self.ELEVENLABS_OUTPUT_FORMAT else 'Not set'}
+  - ElevenLabs Model ID: {'Set' if self.ELEVENLABS_MODEL_ID else 'Not set'}
+  - Tavily API Key: {'Set' if self.TAVILY_API_KEY else 'Not set'}
 """
 
+
+AppConfig = _AppConfig()
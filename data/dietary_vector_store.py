@@ -1,13 +1,25 @@
 """Vector store for dietary requirements data using ChromaDB."""
 import chromadb
-import json
+import numpy as np
 from chromadb.config import Settings
 from pathlib import Path
-from typing import List, Dict, Optional
-from sentence_transformers import SentenceTransformer
+from typing import Any, List, Dict, Optional, Tuple
+from data.embedder import EmbeddingStoreMixin, get_embedding_model
+from data.fast_json import load_path
+from data.query_cache import QueryCache
 
 
-class DietaryRequirementsVectorStore:
+# Embeddings are stored unit-length, so inner product distance (1 - cosine) needs no per-query normalization
+DIETARY_COLLECTION_METADATA = {
+    "description": "Dietary requirements: minerals, vitamins, and nutrition recommendations",
+    "hnsw:space": "ip"
+}
+
+# Collections up to this size are searched by brute force over an in-memory matrix
+BRUTE_FORCE_MAX_DOCUMENTS = 1000
+
+
+class DietaryRequirementsVectorStore(EmbeddingStoreMixin):
     """Vector store for dietary requirements (minerals, vitamins, nutrition)."""
     
     def __init__(
@@ -36,6 +48,13 @@ class DietaryRequirementsVectorStore:
         self.vitamin_path = vitamin_path
         self.nutrition_path = nutrition_path
         self._data_cache = None  # Cache for loaded data
+        self._label_cache: Dict[str, str] = {}  # Display labels by nutrient key
+        self._by_key: Dict[Tuple[str, str], Dict] = {}  # Merged requirements by (age_group, gender)
+        self._search_cache = QueryCache()  # Formatted results by (query, n_results)
+        self._embed_cache = QueryCache(ttl_seconds=None)  # Query text -> embedding (fixed per model)
+        self._matrix: Optional[np.ndarray] = None  # Stored embeddings for brute-force search
+        self._brute_force: Optional[bool] = None  # Whether the collection is small enough (None until checked)
+        self._rows: List[Tuple[str, str, Dict]] = []  # (id, document, metadata) per matrix row
         
         # Initialize ChromaDB
         self.client = chromadb.PersistentClient(
@@ -44,114 +63,204 @@ class DietaryRequirementsVectorStore:
         )
         
         # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name="dietary_requirements",
-            metadata={"description": "Dietary requirements: minerals, vitamins, and nutrition recommendations"}
-        )
+        self._open_collection("dietary_requirements", DIETARY_COLLECTION_METADATA)
         
-        # Load embedding model (runs locally, no API needed)
-        print(f"Loading embedding model: {embedding_model}...")
-        self.embedding_model = SentenceTransformer(embedding_model)
-        print(f"✓ Loaded embedding model: {embedding_model}")
+        # Load embedding model (runs locally, no API needed; shared with other stores)
+        self.embedding_model_name = embedding_model
+        self.embedding_model = get_embedding_model(embedding_model)
     
-    def add_documents(self, documents: List[Dict]):
-        """Add documents to the vector store."""
-        texts = [doc['text'] for doc in documents]
-        ids = [doc['id'] for doc in documents]
-        metadatas = [doc['metadata'] for doc in documents]
-        
-        # Generate embeddings
-        print("Generating embeddings...")
-        embeddings = self.embedding_model.encode(texts, show_progress_bar=True)
-        
-        # Add to ChromaDB
-        self.collection.add(
-            embeddings=embeddings.tolist(),
-            documents=texts,
-            ids=ids,
-            metadatas=metadatas
-        )
-        print(f"✓ Added {len(documents)} documents to vector store")
+    def _documents_added(self):
+        """Drop cached results and the brute-force matrix, which may now be incomplete."""
+        super()._documents_added()
+        self._matrix = None
+        self._brute_force = None
     
     def search(self, query: str, n_results: int = 5) -> List[Dict]:
-        """Search for similar dietary requirements information."""
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode([query])[0]
-        
-        # Search
-        results = self.collection.query(
-            query_embeddings=[query_embedding.tolist()],
-            n_results=n_results
-        )
+        """
+        Search for similar dietary requirements information.
         
-        # Format results
-        formatted_results = []
-        if results['ids'] and len(results['ids'][0]) > 0:
-            for i in range(len(results['ids'][0])):
-                formatted_results.append({
-                    'id': results['ids'][0][i],
-                    'text': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i],
-                    'distance': results['distances'][0][i] if 'distances' in results and results['distances'] else None
-                })
-        
-        return formatted_results
+        Results are cached by (query, n_results) for a few minutes and must be
+        treated as read-only.
+        """
+        return self.search_batch([query], n_results=n_results)[0]
+    
+    def search_batch(self, queries: List[str], n_results: int = 5) -> List[List[Dict]]:
+        """
+        Search for several queries with one embedding pass.
+        
+        Queries with cached results are answered from the search cache; only the
+        rest are embedded. Small collections are then ranked by one matrix product
+        over the stored embeddings, larger ones by a single Chroma query.
+        """
+        if not queries:
+            return []
+        
+        cache_keys = [(query, n_results) for query in queries]
+        all_results, missing = self._cached_searches(queries, cache_keys)
+        if not missing:
+            return all_results
+        
+        # Generate all missing query embeddings in a single forward pass
+        query_embeddings = self.embed_queries(list(missing))
+        
+        query_matrix = np.asarray(query_embeddings, dtype=np.float32)
+        if self._load_matrix():
+            results = self._brute_force_query(query_matrix, n_results)
+        else:
+            # Search (Chroma accepts multiple query embeddings at once)
+            results = self.collection.query(query_embeddings=query_matrix, n_results=n_results)
+        
+        # Format results per query
+        results_per_miss = []
+        for m in range(len(missing)):
+            formatted_results = []
+            if results['ids'] and len(results['ids'][m]) > 0:
+                for i in range(len(results['ids'][m])):
+                    formatted_results.append({
+                        'id': results['ids'][m][i],
+                        'text': results['documents'][m][i],
+                        'metadata': results['metadatas'][m][i],
+                        'distance': results['distances'][m][i] if 'distances' in results and results['distances'] else None
+                    })
+            results_per_miss.append(formatted_results)
+        self._store_searches(all_results, missing, cache_keys, results_per_miss)
+        
+        return all_results
+    
+    def _load_matrix(self) -> bool:
+        """Load all stored embeddings once; False if the collection is too large for brute force."""
+        if self._brute_force is None:
+            # Decided once, so large collections skip the count() round trip on later searches
+            self._brute_force = self.collection.count() <= BRUTE_FORCE_MAX_DOCUMENTS
+        if not self._brute_force:
+            return False
+        if self._matrix is None:
+            stored = self.collection.get(include=["embeddings", "documents", "metadatas"])
+            dimension = self.embedding_model.get_sentence_embedding_dimension()
+            # Rows first: concurrent searches check _matrix alone
+            self._rows = list(zip(stored['ids'], stored['documents'], stored['metadatas']))
+            self._matrix = np.asarray(stored['embeddings'], dtype=np.float32).reshape(-1, dimension)
+        return True
+    
+    def _brute_force_query(self, query_matrix: np.ndarray, n_results: int) -> Dict[str, List[List]]:
+        """Rank all stored embeddings exactly, returning results shaped like collection.query."""
+        # Stored and query embeddings are unit-length, so dot products are cosine similarities
+        similarities = query_matrix @ self._matrix.T
+        distances = 2.0 - 2.0 * similarities if self.distance_space == "l2" else 1.0 - similarities
+        top = np.argsort(distances, axis=1)[:, :n_results]
+        
+        results = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        for row_distances, indices in zip(distances, top):
+            rows = [self._rows[i] for i in indices]
+            results['ids'].append([doc_id for doc_id, _, _ in rows])
+            results['documents'].append([document for _, document, _ in rows])
+            results['metadatas'].append([metadata for _, _, metadata in rows])
+            results['distances'].append(row_distances[indices].tolist())
+        return results
     
     def _load_data_cache(self):
         """Lazy load dietary data from JSON files."""
         if self._data_cache is not None:
             return
         
-        self._data_cache = {
+        data_cache = {
             'minerals': {},
             'vitamins': {},
             'nutrition': {}
         }
         
+        # Build everything locally and publish _data_cache last, so a concurrent
+        # caller never sees a partially built cache (tools run on worker threads)
+        
         # Load minerals
         if self.mineral_path and self.mineral_path.exists():
             try:
-                with open(self.mineral_path, 'r', encoding='utf-8') as f:
-                    self._data_cache['minerals'] = json.load(f)
+                data_cache['minerals'] = load_path(self.mineral_path)
             except Exception as e:
                 print(f"Warning: Could not load mineral data: {e}")
         
         # Load vitamins
         if self.vitamin_path and self.vitamin_path.exists():
             try:
-                with open(self.vitamin_path, 'r', encoding='utf-8') as f:
-                    self._data_cache['vitamins'] = json.load(f)
+                data_cache['vitamins'] = load_path(self.vitamin_path)
             except Exception as e:
                 print(f"Warning: Could not load vitamin data: {e}")
         
         # Load nutrition
         if self.nutrition_path and self.nutrition_path.exists():
             try:
-                with open(self.nutrition_path, 'r', encoding='utf-8') as f:
-                    self._data_cache['nutrition'] = json.load(f)
+                data_cache['nutrition'] = load_path(self.nutrition_path)
             except Exception as e:
                 print(f"Warning: Could not load nutrition data: {e}")
-    
-    def get_requirements_by_key(self, age_group: str, gender: str) -> Optional[Dict]:
-        """Retrieve full dietary requirements data by age group and gender."""
-        self._load_data_cache()
         
-        doc_id = f"dietary_{age_group}_{gender}"
+        # Precompute display labels once (e.g. "vitamin_b12_mcg" -> "Vitamin B12 Mcg")
+        for dataset in data_cache.values():
+            for genders in dataset.values():
+                for values in genders.values():
+                    for key in values:
+                        if key not in self._label_cache:
+                            self._label_cache[key] = key.replace('_', ' ').title()
         
-        # Try to get from cache
-        minerals = self._data_cache.get('minerals', {}).get(age_group, {}).get(gender, {})
-        vitamins = self._data_cache.get('vitamins', {}).get(age_group, {}).get(gender, {})
-        nutrition = self._data_cache.get('nutrition', {}).get(age_group, {}).get(gender, {})
-        
-        if not (minerals or vitamins or nutrition):
-            return None
+        # Merge the three datasets once per (age_group, gender) so lookups are a single dict hit
+        minerals_data, vitamins_data, nutrition_data = (
+            data_cache['minerals'], data_cache['vitamins'], data_cache['nutrition']
+        )
+        for age_group in minerals_data.keys() | vitamins_data.keys() | nutrition_data.keys():
+            by_gender = [data.get(age_group, {}) for data in (minerals_data, vitamins_data, nutrition_data)]
+            for gender in set().union(*by_gender):
+                minerals, vitamins, nutrition = (genders.get(gender, {}) for genders in by_gender)
+                if minerals or vitamins or nutrition:
+                    self._by_key[(age_group, gender)] = self._merge_requirements(
+                        age_group, gender, minerals, vitamins, nutrition
+                    )
         
+        self._data_cache = data_cache
+    
+    def _display_entries(self, values: Dict) -> List[Tuple[str, str, Any]]:
+        """Pair each nutrient key and value with its precomputed display label."""
+        return [
+            (key, self._label_cache.get(key) or key.replace('_', ' ').title(), value)
+            for key, value in values.items()
+        ]
+    
+    def _merge_requirements(
+        self,
+        age_group: str,
+        gender: str,
+        minerals: Dict,
+        vitamins: Dict,
+        nutrition: Dict
+    ) -> Dict:
+        """Combine one age group and gender's entries from the three datasets."""
         return {
             'age_group': age_group,
             'gender': gender,
             'minerals': minerals,
             'vitamins': vitamins,
-            'nutrition': nutrition
+            'nutrition': nutrition,
+            # (raw_key, display_label, value) tuples for formatting
+            'display': {
+                'minerals': self._display_entries(minerals),
+                'vitamins': self._display_entries(vitamins),
+                'nutrition': self._display_entries(nutrition)
+            }
+        }
+    
+    def get_requirements_by_key(self, age_group: str, gender: str) -> Optional[Dict]:
+        """Retrieve full dietary requirements data by age group and gender (read-only, shared)."""
+        self._load_data_cache()
+        return self._by_key.get((age_group, gender))
+    
+    def warm_up(self):
+        """Load the requirement data and stored embeddings so the first lookup skips this setup."""
+        self._load_data_cache()
+        self._load_matrix()
+    
+    def get_cache_stats(self) -> Dict[str, Dict]:
+        """Get hit/miss statistics for the search result and query embedding caches."""
+        return {
+            'search': self._search_cache.stats(),
+            'embeddings': self._embed_cache.stats()
         }
     
     def get_collection_count(self) -> int:
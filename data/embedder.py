@@ -0,0 +1,332 @@
+"""Sentence transformer loading and document embedding shared by the vector stores."""
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+# CPU threads for embedding inference; unset keeps the torch default (one per physical core)
+TORCH_NUM_THREADS = os.getenv("TORCH_NUM_THREADS")
+
+if TORCH_NUM_THREADS:
+    # OpenMP/MKL read these when torch is first imported
+    os.environ.setdefault("OMP_NUM_THREADS", TORCH_NUM_THREADS)
+    os.environ.setdefault("MKL_NUM_THREADS", TORCH_NUM_THREADS)
+
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+
+if TORCH_NUM_THREADS:
+    torch.set_num_threads(int(TORCH_NUM_THREADS))
+    try:
+        # Encoding is a single op stream, so inter-op parallelism only adds contention
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already fixed once inter-op work has started
+
+
+# Inference backend: "torch" (default), "onnx" or "openvino". Non-torch backends
+# need sentence-transformers>=3.2 with the matching extra, e.g. sentence-transformers[onnx]
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+
+# Optional model file for non-torch backends, e.g. "onnx/model_qint8_avx512_vnni.onnx"
+# for the dynamically int8-quantized all-MiniLM-L6-v2 export
+EMBED_MODEL_FILE = os.getenv("EMBED_MODEL_FILE")
+
+# Device for the embedding model, e.g. "cuda", "cuda:1", "mps" or "cpu" (unset picks the best available)
+EMBED_DEVICE = os.getenv("EMBED_DEVICE") or None
+
+# Weight precision on CUDA devices: "float16" (default), "bfloat16" (Ampere+) or "float32"
+EMBED_GPU_DTYPE = os.getenv("EMBED_GPU_DTYPE", "float16")
+
+# Default texts per encode() batch when ingesting documents
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+
+# Documents encoded per chunk when indexing; each chunk is inserted while the next one encodes
+EMBED_CHUNK_SIZE = int(os.getenv("EMBED_CHUNK_SIZE", "1024"))
+
+# One loaded model per name, shared by every vector store in the process
+_models: Dict[str, SentenceTransformer] = {}
+_models_lock = threading.Lock()
+
+
+def load_embedding_model(model_name: str) -> SentenceTransformer:
+    """Load a sentence transformer for inference on the configured backend."""
+    print(f"Loading embedding model: {model_name} ({EMBED_BACKEND})...")
+    if EMBED_BACKEND == "torch":
+        model = SentenceTransformer(model_name, device=EMBED_DEVICE)
+        if model.device.type == "cuda" and EMBED_GPU_DTYPE != "float32":
+            # Half precision roughly doubles GPU throughput with negligible effect on ranking
+            model = model.to(getattr(torch, EMBED_GPU_DTYPE))
+    else:
+        model_kwargs = {"file_name": EMBED_MODEL_FILE} if EMBED_MODEL_FILE else None
+        model = SentenceTransformer(
+            model_name,
+            device=EMBED_DEVICE,
+            backend=EMBED_BACKEND,
+            model_kwargs=model_kwargs
+        )
+    model.eval()  # Inference only
+    print(f"✓ Loaded embedding model: {model_name} on {model.device}")
+    return model
+
+
+def get_embedding_model(model_name: str) -> SentenceTransformer:
+    """Return the shared model for model_name, loading it on first use."""
+    # Held while loading so concurrent first callers wait instead of loading twice
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            model = _models[model_name] = load_embedding_model(model_name)
+    return model
+
+
+# Digest size of embedding cache keys, in bytes
+_KEY_SIZE = 16
+
+
+class EmbeddingDiskCache:
+    """
+    Document embeddings keyed by a digest of their text, persisted as one .npz file.
+    
+    Lets a re-index after deleting a collection reuse every embedding whose
+    text is unchanged instead of running the model again.
+    """
+    
+    def __init__(self, path: Path):
+        """
+        Initialize the cache, loading any embeddings saved at path.
+        
+        Args:
+            path: .npz file holding the cache (see embedding_cache_path)
+        """
+        self.path = path
+        self._embeddings: Dict[bytes, np.ndarray] = {}
+        self._dirty = False
+        if path.exists():
+            try:
+                with np.load(path) as data:
+                    self._embeddings = dict(zip(self._decode_keys(data['keys']), data['embeddings']))
+            except Exception as e:
+                print(f"Warning: Could not load embedding cache: {e}")
+    
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=_KEY_SIZE).digest()
+    
+    @staticmethod
+    def _decode_keys(keys: np.ndarray) -> List[bytes]:
+        """Turn the saved key array back into digests."""
+        if keys.dtype == np.uint8:
+            return [row.tobytes() for row in keys]
+        # Older caches stored 'S16' keys, which lose trailing NUL bytes on read
+        return [key.ljust(_KEY_SIZE, b'\0') for key in keys.tolist()]
+    
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for text, or None on a miss."""
+        return self._embeddings.get(self._key(text))
+    
+    def put(self, text: str, embedding: np.ndarray):
+        """Cache the embedding for text (written out by save)."""
+        self._embeddings[self._key(text)] = embedding
+        self._dirty = True
+    
+    def save(self):
+        """Write the cache to disk if anything was added."""
+        if not self._dirty:
+            return
+        # Raw uint8 rows, since 'S' arrays drop trailing NUL bytes of a digest
+        keys = np.frombuffer(b"".join(self._embeddings), dtype=np.uint8).reshape(-1, _KEY_SIZE)
+        np.savez(self.path, keys=keys, embeddings=np.stack(list(self._embeddings.values())))
+        self._dirty = False
+
+
+def embedding_cache_path(directory: Path, model_name: str) -> Path:
+    """Cache file for one model and backend configuration inside directory."""
+    tag = hashlib.blake2b(f"{model_name}|{EMBED_BACKEND}|{EMBED_MODEL_FILE}".encode('utf-8'), digest_size=8)
+    return directory / f"embeddings_{tag.hexdigest()}.npz"
+
+
+def _encode_documents(
+    model: SentenceTransformer,
+    texts: List[str],
+    batch_size: int,
+    cache: Optional[EmbeddingDiskCache]
+) -> np.ndarray:
+    """Encode texts as unit-length float32 vectors, reusing cached embeddings."""
+    embeddings = [cache.get(text) for text in texts] if cache is not None else [None] * len(texts)
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        encoded = model.encode(
+            [texts[i] for i in missing],
+            batch_size=batch_size,
+            show_progress_bar=True,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        ).astype(np.float32, copy=False)  # float16 on half-precision GPUs
+        for i, embedding in zip(missing, encoded):
+            embeddings[i] = embedding
+            if cache is not None:
+                cache.put(texts[i], embedding)
+    return np.stack(embeddings)
+
+
+def embed_into_collection(
+    collection,
+    model: SentenceTransformer,
+    documents: List[Dict],
+    batch_size: int,
+    cache: Optional[EmbeddingDiskCache] = None
+):
+    """
+    Embed documents chunk by chunk and add them to a Chroma collection.
+    
+    Inserts run on a background thread, so writing one chunk overlaps with
+    encoding the next and total time approaches max(embed, insert). Texts found
+    in cache are not re-encoded, and new embeddings are saved to it at the end.
+    """
+    futures = []
+    with ThreadPoolExecutor(max_workers=1) as executor:  # One writer keeps inserts in order
+        for start in range(0, len(documents), EMBED_CHUNK_SIZE):
+            chunk = documents[start:start + EMBED_CHUNK_SIZE]
+            texts = [doc['text'] for doc in chunk]
+            futures.append(executor.submit(
+                collection.add,
+                embeddings=_encode_documents(model, texts, batch_size, cache),
+                documents=texts,
+                ids=[doc['id'] for doc in chunk],
+                metadatas=[doc['metadata'] for doc in chunk]
+            ))
+    for future in futures:
+        future.result()  # Re-raise any insert error
+    if cache is not None:
+        cache.save()
+
+
+def collection_distance_space(collection) -> str:
+    """Distance space of a Chroma collection."""
+    # Collections created before the switch to "ip" keep Chroma's squared L2 distance
+    return (collection.metadata or {}).get("hnsw:space", "l2")
+
+
+class EmbeddingStoreMixin:
+    """
+    Document ingestion and cached query embedding shared by the vector stores.
+    
+    Expects client, persist_directory, embedding_model, embedding_model_name
+    and the _search_cache/_embed_cache QueryCache attributes on the store;
+    collection and distance_space are set by _open_collection.
+    """
+    
+    def _open_collection(self, name: str, metadata: Dict):
+        """Open the named collection, creating it with metadata only if it does not exist."""
+        try:
+            # get_or_create_collection would overwrite an existing collection's metadata on
+            # some chromadb versions, hiding the space its HNSW index was actually built with
+            self.collection = self.client.get_collection(name=name)
+        except Exception:  # Not found (ValueError or NotFoundError, depending on the chromadb version)
+            self.collection = self.client.create_collection(name=name, metadata=metadata)
+        self.distance_space = collection_distance_space(self.collection)
+    
+    def recreate_collection(self, name: str, metadata: Dict):
+        """Delete the named collection and create it empty with metadata."""
+        self.client.delete_collection(name)
+        self._open_collection(name, metadata)
+        self._documents_added()  # Cached results describe the deleted collection
+    
+    def add_documents(self, documents: List[Dict], batch_size: Optional[int] = None):
+        """
+        Add documents to the vector store, skipping ids it already contains.
+        
+        Args:
+            documents: Documents with 'id', 'text' and 'metadata' keys
+            batch_size: Texts per encode() batch (defaults to EMBED_BATCH_SIZE). GPU users
+                can raise this to 128-256; lower it to 8-16 on GPUs with ~8 GB of VRAM.
+        """
+        batch_size = batch_size or EMBED_BATCH_SIZE
+        # Only embed documents whose ids are not stored yet
+        existing_ids = set(self.collection.get(ids=[doc['id'] for doc in documents], include=[])['ids'])
+        if existing_ids:
+            documents = [doc for doc in documents if doc['id'] not in existing_ids]
+            print(f"Skipping {len(existing_ids)} documents already in vector store")
+            if not documents:
+                return
+        
+        # Order by text length so each batch pads to similar lengths; ids and
+        # metadata move with their text, so no unsorting is needed afterwards
+        documents = sorted(documents, key=lambda doc: len(doc['text']))
+        
+        # Generate embeddings and add them to ChromaDB, overlapping the two
+        print("Generating embeddings...")
+        cache = EmbeddingDiskCache(embedding_cache_path(self.persist_directory, self.embedding_model_name))
+        embed_into_collection(self.collection, self.embedding_model, documents, batch_size, cache)
+        self._documents_added()
+        print(f"✓ Added {len(documents)} documents to vector store")
+    
+    def _documents_added(self):
+        """Drop state made stale by new documents."""
+        self._search_cache.clear()  # Cached results may now be incomplete
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """Generate the embedding for a search query, reusing it for repeated queries."""
+        embedding = self._embed_cache.get(query)
+        if embedding is None:
+            embedding = self.embedding_model.encode([query], normalize_embeddings=True)[0]
+            self._embed_cache.put(query, embedding)
+        return embedding
+    
+    def embed_queries(self, queries: List[str]) -> List[np.ndarray]:
+        """Generate embeddings for several queries, encoding cache misses in one pass."""
+        embeddings = [self._embed_cache.get(query) for query in queries]
+        # Positions of each distinct uncached query, so repeats are encoded once
+        missing = _group_misses(queries, embeddings)
+        if missing:
+            encoded = self.embedding_model.encode(
+                list(missing),
+                batch_size=len(missing),
+                normalize_embeddings=True
+            )
+            for (query, positions), embedding in zip(missing.items(), encoded):
+                for q in positions:
+                    embeddings[q] = embedding
+                self._embed_cache.put(query, embedding)
+        return embeddings
+    
+    def _cached_searches(
+        self,
+        queries: List[str],
+        cache_keys: List[Hashable]
+    ) -> Tuple[List[Optional[List[Dict]]], Dict[str, List[int]]]:
+        """
+        Look up each query's results in the search cache.
+        
+        Returns the results per query (None on a miss) and the positions of each
+        distinct uncached query, so repeats share one search.
+        """
+        all_results = [self._search_cache.get(key) for key in cache_keys]
+        return all_results, _group_misses(queries, all_results)
+    
+    def _store_searches(
+        self,
+        all_results: List[Optional[List[Dict]]],
+        missing: Dict[str, List[int]],
+        cache_keys: List[Hashable],
+        results_per_miss
+    ):
+        """Fill in and cache the results searched for each distinct uncached query."""
+        for positions, results in zip(missing.values(), results_per_miss):
+            for q in positions:
+                all_results[q] = results
+            self._search_cache.put(cache_keys[positions[0]], results)
+
+
+def _group_misses(queries: List[str], values: List) -> Dict[str, List[int]]:
+    """Map each distinct query whose value is None to its positions in queries."""
+    missing: Dict[str, List[int]] = {}
+    for q, value in enumerate(values):
+        if value is None:
+            missing.setdefault(queries[q], []).append(q)
+    return missing
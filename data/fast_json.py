@@ -0,0 +1,30 @@
+"""JSON parsing that uses orjson when installed and falls back to the standard library."""
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson  # Optional: several times faster than json for the USDA data
+except ImportError:
+    orjson = None
+
+
+# Both parsers accept bytes as well as str
+loads = orjson.loads if orjson is not None else json.loads
+
+
+def load_path(path: Path) -> Any:
+    """
+    Parse a JSON file, reading it as bytes to skip the text decoding step.
+    
+    With orjson the file is memory-mapped and parsed in place, so no separate
+    copy of its contents is held while the parsed objects are built.
+    """
+    with open(path, 'rb') as f:
+        # Empty files cannot be mapped; let the parser raise its usual error
+        if orjson is None or os.fstat(f.fileno()).st_size == 0:
+            return loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
@@ -1,34 +1,51 @@
 """Process dietary requirements JSON data (minerals, vitamins, nutrition) into searchable documents."""
-import json
+import math
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Tuple
+from data.fast_json import load_path
 
 
-def get_age_group(age: int) -> str:
-    """Map age to age group string."""
-    age_ranges = [
-        (1, 1, "1"),
-        (2, 3, "2-3"),
-        (4, 6, "4-6"),
-        (7, 10, "7-10"),
-        (11, 14, "11-14"),
-        (15, 18, "15-18"),
-        (19, 64, "19-64"),
-        (65, 74, "65-74"),
-        (75, float('inf'), "75+")
-    ]
-    
-    for min_age, max_age, group in age_ranges:
+# Age ranges as (min_age, max_age, group), in ascending order
+_AGE_RANGES = (
+    (1, 1, "1"),
+    (2, 3, "2-3"),
+    (4, 6, "4-6"),
+    (7, 10, "7-10"),
+    (11, 14, "11-14"),
+    (15, 18, "15-18"),
+    (19, 64, "19-64"),
+    (65, 74, "65-74"),
+    (75, float('inf'), "75+")
+)
+
+
+def _age_group_from_ranges(age: int) -> str:
+    """Map age to age group string by scanning the age ranges."""
+    for min_age, max_age, group in _AGE_RANGES:
         if min_age <= age <= max_age:
             return group
     
     return "75+"  # Fallback
 
 
+# Precomputed age -> age group table for the supported age range (0-120)
+_AGE_TO_GROUP = tuple(_age_group_from_ranges(age) for age in range(121))
+
+
+def get_age_group(age: int) -> str:
+    """Map age to age group string."""
+    # Fractional ages (e.g. 18.5 from an LLM) belong to the group of the completed year
+    if isinstance(age, float) and math.isfinite(age):
+        age = math.floor(age)
+    if isinstance(age, int) and 0 <= age < len(_AGE_TO_GROUP):
+        return _AGE_TO_GROUP[age]
+    return _age_group_from_ranges(age)
+
+
 def load_dietary_json(json_path: Path) -> Dict:
     """Load dietary requirements JSON data."""
-    with open(json_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return load_path(json_path)
 
 
 def format_nutrient_value(value, unit: str = "") -> str:
@@ -44,6 +61,22 @@ def format_nutrient_value(value, unit: str = "") -> str:
     return f"{value} {unit}".strip()
 
 
+@lru_cache(maxsize=None)
+def _nutrient_key_info(key: str) -> Tuple[str, str]:
+    """Split a nutrient key into its display name and unit (e.g. "iron_mg" -> ("iron mg", "mg"))."""
+    unit = key.rsplit('_', 1)[-1] if '_' in key else ""
+    return key.replace('_', ' '), unit
+
+
+def _format_nutrients(values: Dict) -> List[str]:
+    """Format each nutrient of one dataset as "name: value unit"."""
+    formatted = []
+    for key, value in values.items():
+        name, unit = _nutrient_key_info(key)
+        formatted.append(f"{name}: {format_nutrient_value(value, unit)}")
+    return formatted
+
+
 def create_unified_document(
     age_group: str,
     gender: str,
@@ -53,46 +86,29 @@ def create_unified_document(
 ) -> Dict:
     """Create a unified document combining all three datasets for an age group and gender."""
     
-    # Add minerals
-    mineral_text = []
-    for key, value in minerals.items():
-        # Extract unit from key (e.g., "iron_mg" -> "mg")
-        unit = key.split('_')[-1] if '_' in key else ""
-        formatted_value = format_nutrient_value(value, unit)
-        mineral_text.append(f"{key.replace('_', ' ')}: {formatted_value}")
-    
-    # Add vitamins
-    vitamin_text = []
-    for key, value in vitamins.items():
-        unit = key.split('_')[-1] if '_' in key else ""
-        formatted_value = format_nutrient_value(value, unit)
-        vitamin_text.append(f"{key.replace('_', ' ')}: {formatted_value}")
-    
-    # Add nutrition/macronutrients
-    nutrition_text = []
-    for key, value in nutrition.items():
-        unit = key.split('_')[-1] if '_' in key else ""
-        formatted_value = format_nutrient_value(value, unit)
-        nutrition_text.append(f"{key.replace('_', ' ')}: {formatted_value}")
-    
-    # Create comprehensive searchable text
-    searchable_text = f"""
-    Age group: {age_group}
-    Gender: {gender}
-    
-    Minerals: {', '.join(mineral_text)}
-    
-    Vitamins: {', '.join(vitamin_text)}
-    
-    Nutrition (Macronutrients): {', '.join(nutrition_text)}
-    """
+    # Format minerals, vitamins and nutrition/macronutrients (key info is cached per key)
+    mineral_text = _format_nutrients(minerals)
+    vitamin_text = _format_nutrients(vitamins)
+    nutrition_text = _format_nutrients(nutrition)
+    
+    # Create comprehensive searchable text (sections separated by blank lines, no indentation)
+    searchable_text = "\n".join([
+        f"Age group: {age_group}",
+        f"Gender: {gender}",
+        "",
+        f"Minerals: {', '.join(mineral_text)}",
+        "",
+        f"Vitamins: {', '.join(vitamin_text)}",
+        "",
+        f"Nutrition (Macronutrients): {', '.join(nutrition_text)}"
+    ])
     
     # Create unique document ID
     doc_id = f"dietary_{age_group}_{gender}"
     
     return {
         'id': doc_id,
-        'text': searchable_text.strip(),
+        'text': searchable_text,
         'metadata': {
             'age_group': age_group,
             'gender': gender,
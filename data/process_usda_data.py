@@ -1,16 +1,104 @@
 """Process USDA FoodData Central JSON data into searchable documents."""
 import json
+import pickle
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional, Tuple
+from data.fast_json import load_path
+
+try:
+    import ijson  # Optional: streams FoundationFoods one record at a time
+except ImportError:
+    ijson = None
+
+
+# Common important nutrients to prioritize in document text
+IMPORTANT_NUTRIENTS = frozenset([
+    'Energy', 'Protein', 'Total lipid (fat)', 'Carbohydrate, by difference',
+    'Fiber, total dietary', 'Calcium', 'Iron', 'Vitamin C', 'Vitamin A',
+    'Sodium', 'Sugars, total including NLEA'
+])
+
+# Important nutrients are always kept; others fill the text up to this many entries
+MAX_DOCUMENT_NUTRIENTS = 15
 
 
 def load_usda_json(json_path: Path) -> List[Dict]:
     """Load USDA JSON data."""
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_path(json_path)
     return data.get('FoundationFoods', [])
 
 
+def iter_usda_foods(json_path: Path) -> Iterator[Dict]:
+    """
+    Yield USDA food records one at a time.
+    
+    With ijson installed only the current record is held in memory; otherwise
+    the whole file is loaded with load_usda_json.
+    """
+    if ijson is None:
+        yield from load_usda_json(json_path)
+        return
+    
+    with open(json_path, 'rb') as f:
+        yield from ijson.items(f, 'FoundationFoods.item', use_float=True)
+
+
+def build_fdc_offset_index(json_path: Path) -> Dict[str, Tuple[int, int]]:
+    """
+    Scan the USDA JSON once and record the byte range of every food record.
+    
+    Returns:
+        Mapping of FDC ID (as string) to (start, end) byte offsets in the file
+    """
+    raw = json_path.read_bytes()
+    # latin-1 maps each byte to one character, so string offsets equal byte offsets
+    text = raw.decode('latin-1')
+    decoder = json.JSONDecoder()
+    
+    pos = text.index('[', text.index('"FoundationFoods"')) + 1
+    offsets = {}
+    while True:
+        # Skip whitespace and separators between records
+        while text[pos] in ' \t\r\n,':
+            pos += 1
+        if text[pos] == ']':
+            break
+        food, end = decoder.raw_decode(text, pos)
+        offsets[str(food.get('fdcId'))] = (pos, end)
+        pos = end
+    
+    return offsets
+
+
+def _source_stamp(json_path: Path) -> Tuple[int, int]:
+    """Identify the current version of the source file by size and mtime."""
+    stat = json_path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def save_fdc_offset_index(offsets: Dict[str, Tuple[int, int]], json_path: Path, index_path: Path):
+    """Persist the offset index together with the source file size and mtime for staleness checks."""
+    size, mtime_ns = _source_stamp(json_path)
+    with open(index_path, 'wb') as f:
+        pickle.dump({'source_size': size, 'source_mtime_ns': mtime_ns, 'offsets': offsets}, f)
+
+
+def load_fdc_offset_index(json_path: Path, index_path: Path) -> Optional[Dict[str, Tuple[int, int]]]:
+    """Load a persisted offset index, or return None if it is missing or stale."""
+    if not index_path.exists():
+        return None
+    try:
+        with open(index_path, 'rb') as f:
+            index = pickle.load(f)
+    except Exception as e:
+        print(f"Warning: Could not load FDC offset index: {e}")
+        return None
+    # A same-size edit can still move records, so the mtime must match too
+    if (index.get('source_size'), index.get('source_mtime_ns')) != _source_stamp(json_path):
+        return None
+    return index.get('offsets')
+
+
 def create_document(food_item: Dict) -> Dict:
     """Convert food item to a searchable document."""
     # Extract key information
@@ -22,45 +110,34 @@ def create_document(food_item: Dict) -> Dict:
     
     # Build nutrient summary - prioritize important nutrients
     nutrients = food_item.get('foodNutrients', [])
-    nutrient_text = []
-    
-    # Common important nutrients to prioritize
-    important_nutrients = [
-        'Energy', 'Protein', 'Total lipid (fat)', 'Carbohydrate, by difference',
-        'Fiber, total dietary', 'Calcium', 'Iron', 'Vitamin C', 'Vitamin A',
-        'Sodium', 'Sugars, total including NLEA'
-    ]
+    important_text = []
+    other_text = []
     
-    # First, add important nutrients
+    # Single pass: important nutrients first, then others (limit to avoid too long text)
     for nutrient in nutrients:
-        nutrient_name = nutrient.get('nutrient', {}).get('name', '')
-        if nutrient_name in important_nutrients:
-            amount = nutrient.get('amount', 0)
-            unit = nutrient.get('nutrient', {}).get('unitName', '')
-            if amount is not None and amount != 0:
-                nutrient_text.append(f"{nutrient_name}: {amount} {unit}")
+        amount = nutrient.get('amount', 0)
+        if amount is None or amount == 0:
+            continue
+        info = nutrient.get('nutrient') or {}
+        nutrient_name = info.get('name', '')
+        if nutrient_name in IMPORTANT_NUTRIENTS:
+            important_text.append(f"{nutrient_name}: {amount} {info.get('unitName', '')}")
+        elif len(other_text) < MAX_DOCUMENT_NUTRIENTS:
+            other_text.append(f"{nutrient_name}: {amount} {info.get('unitName', '')}")
+    nutrient_text = important_text + other_text[:max(0, MAX_DOCUMENT_NUTRIENTS - len(important_text))]
     
-    # Then add other nutrients (limit to avoid too long text)
-    for nutrient in nutrients:
-        nutrient_name = nutrient.get('nutrient', {}).get('name', '')
-        if nutrient_name not in important_nutrients and len(nutrient_text) < 15:
-            amount = nutrient.get('amount', 0)
-            unit = nutrient.get('nutrient', {}).get('unitName', '')
-            if amount is not None and amount != 0:
-                nutrient_text.append(f"{nutrient_name}: {amount} {unit}")
-    
-    # Create searchable text
-    searchable_text = f"""
-    Food: {description}
-    Category: {category_desc}
-    Food Class: {food_class}
-    FDC ID: {fdc_id}
-    Nutrients: {', '.join(nutrient_text)}
-    """
+    # Create searchable text (one field per line, no indentation)
+    searchable_text = "\n".join([
+        f"Food: {description}",
+        f"Category: {category_desc}",
+        f"Food Class: {food_class}",
+        f"FDC ID: {fdc_id}",
+        f"Nutrients: {', '.join(nutrient_text)}"
+    ])
     
     return {
         'id': str(fdc_id),
-        'text': searchable_text.strip(),
+        'text': searchable_text,
         'metadata': {
             'fdc_id': fdc_id,
             'description': description,
@@ -73,14 +150,7 @@ def create_document(food_item: Dict) -> Dict:
 
 
 def process_all_foods(json_path: Path) -> List[Dict]:
-    """Process all food items into documents."""
-    foods = load_usda_json(json_path)
-    documents = []
-    
-    print(f"Processing {len(foods)} food items...")
-    for food in foods:
-        doc = create_document(food)
-        documents.append(doc)
-    
-    return documents
+    """Process all food items into documents, streaming the source records."""
+    print("Processing food items...")
+    return [create_document(food) for food in iter_usda_foods(json_path)]
 
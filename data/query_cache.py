@@ -0,0 +1,68 @@
+"""Thread-safe LRU cache with optional TTL for vector store queries."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class QueryCache:
+    """
+    Bounded LRU cache whose entries expire ttl_seconds after insertion.
+    
+    Keys are any hashable value (e.g. a (query, n_results) tuple). Cached values
+    are returned as-is, so callers must treat them as read-only.
+    """
+    
+    def __init__(self, max_size: int = 2000, ttl_seconds: Optional[float] = 300):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of cached entries
+            ttl_seconds: Entry lifetime in seconds (None for no expiry)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+            self._misses += 1
+            return None
+    
+    def put(self, key: Hashable, value: Any):
+        """Store value under key, evicting the least recently used entry when full."""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else float("inf")
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Remove all cached entries (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counts, hit rate and current size."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'size': len(self._entries)
+            }
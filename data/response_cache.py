@@ -0,0 +1,96 @@
+"""SQLite-backed response cache with per-entry TTL for external search APIs."""
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+
+class ResponseCache:
+    """Persistent key/value cache for formatted API responses."""
+    
+    def __init__(self, db_path: Path):
+        """
+        Initialize the response cache.
+        
+        Args:
+            db_path: Path to the SQLite database file (created if missing)
+        """
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def make_key(namespace: str, *parts) -> str:
+        """Build a compact cache key from a namespace and request parameters."""
+        raw = "\x1f".join([namespace, *map(str, parts)])
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires_at > ?",
+                (key, int(time.time()))
+            ).fetchone()
+        return row[0] if row else None
+    
+    def set(self, key: str, value: str, ttl: int):
+        """Store value under key for ttl seconds."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, int(time.time()) + ttl)
+            )
+            self._conn.commit()
+    
+    async def cached_get(
+        self,
+        key: str,
+        ttl: int,
+        fetch: Callable[[], Awaitable[Optional[str]]]
+    ) -> Optional[str]:
+        """
+        Return the cached value for key, or await fetch() and cache its result.
+        
+        The SQLite lookup and insert run in a worker thread, so callers on the
+        event loop are never blocked by disk I/O. A None result from fetch (e.g.
+        an empty search) is returned without being cached.
+        
+        Args:
+            key: Cache key (see make_key)
+            ttl: Lifetime of a newly fetched value in seconds
+            fetch: Coroutine function producing the value on a miss
+        """
+        cached = await asyncio.to_thread(self.get, key)
+        if cached is not None:
+            return cached
+        value = await fetch()
+        if value is not None:
+            await asyncio.to_thread(self.set, key, value, ttl)
+        return value
+    
+    def purge_expired(self):
+        """Delete all expired entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (int(time.time()),))
+            self._conn.commit()
+
+
+@lru_cache(maxsize=1)
+def get_default_response_cache() -> ResponseCache:
+    """Create the default response cache once and share it across tools."""
+    cache = ResponseCache(Path(__file__).parent / "response_cache.sqlite3")
+    # Reads skip expired rows but never delete them, so drop them once per process
+    cache.purge_expired()
+    return cache
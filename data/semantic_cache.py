@@ -0,0 +1,111 @@
+"""Similarity-keyed cache for formatted responses to repeated or paraphrased queries."""
+import threading
+import numpy as np
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for cache keys and embedding (trim, lowercase, collapse whitespace)."""
+    return " ".join(query.lower().split())
+
+
+class SemanticQueryCache:
+    """
+    Bounded LRU cache keyed on L2-normalized query embeddings.
+    
+    A lookup matches the most similar cached query (one matrix-vector product
+    over all keys) and returns its value if the cosine similarity reaches the
+    threshold. Entries carry a tag (e.g. max_results) that must match exactly.
+    Entries stored with a text key can also be found by get_exact before any
+    embedding is computed. Values are returned as stored, so anything that depends
+    on the caller's wording of the query should be rendered per call.
+    """
+    
+    def __init__(self, capacity: int = 512, threshold: float = 0.95):
+        """
+        Initialize the cache.
+        
+        Args:
+            capacity: Maximum number of cached queries
+            threshold: Minimum cosine similarity for a query to count as a hit
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self._keys: Optional[np.ndarray] = None  # (capacity, dim) float32, allocated on first insert
+        self._tags: List[Optional[Hashable]] = [None] * capacity
+        self._values: List[Any] = [None] * capacity
+        self._texts: List[Optional[str]] = [None] * capacity
+        self._exact: Dict[Tuple[str, Hashable], int] = {}  # (text key, tag) -> slot
+        self._last_used = np.zeros(capacity, dtype=np.int64)  # LRU clock per slot
+        self._clock = 0
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        """Return the embedding as a unit-length float32 vector."""
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+    
+    def _touch(self, index: int) -> Any:
+        """Mark a slot as most recently used and return its value."""
+        self._clock += 1
+        self._last_used[index] = self._clock
+        return self._values[index]
+    
+    def get_exact(self, text: str, tag: Hashable = None) -> Optional[Any]:
+        """Return the cached value for an identical text key, or None on a miss."""
+        with self._lock:
+            index = self._exact.get((text, tag))
+            return None if index is None else self._touch(index)
+    
+    def get(self, embedding: np.ndarray, tag: Hashable = None) -> Optional[Any]:
+        """Return the cached value for the most similar query, or None on a miss."""
+        query = self._normalize(embedding)
+        with self._lock:
+            if self._size == 0:
+                return None
+            
+            similarities = self._keys[:self._size] @ query
+            for index in np.argsort(similarities)[::-1]:
+                if similarities[index] < self.threshold:
+                    break
+                if self._tags[index] == tag:
+                    return self._touch(index)
+        return None
+    
+    def put(self, embedding: np.ndarray, value: Any, tag: Hashable = None, text: Optional[str] = None):
+        """Insert a value, evicting the least recently used entry when full."""
+        key = self._normalize(embedding)
+        with self._lock:
+            if self._keys is None:
+                self._keys = np.zeros((self.capacity, key.shape[0]), dtype=np.float32)
+            
+            # Re-putting a text key overwrites its slot instead of leaving a stale duplicate
+            index = self._exact.get((text, tag)) if text is not None else None
+            if index is None and self._size < self.capacity:
+                index = self._size
+                self._size += 1
+            elif index is None:
+                index = int(np.argmin(self._last_used))
+                if self._texts[index] is not None:
+                    self._exact.pop((self._texts[index], self._tags[index]), None)
+            
+            self._keys[index] = key
+            self._tags[index] = tag
+            self._values[index] = value
+            self._texts[index] = text
+            if text is not None:
+                self._exact[(text, tag)] = index
+            self._touch(index)
+    
+    def clear(self):
+        """Remove all cached entries."""
+        with self._lock:
+            self._tags = [None] * self.capacity
+            self._values = [None] * self.capacity
+            self._texts = [None] * self.capacity
+            self._exact.clear()
+            self._last_used[:] = 0
+            self._size = 0
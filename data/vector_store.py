@@ -1,14 +1,40 @@
 """Vector store for nutrition data using ChromaDB."""
 import chromadb
-import json
+import mmap
+import numpy as np
 from chromadb.config import Settings
+from functools import cached_property
 from pathlib import Path
 from typing import List, Dict, Optional
 from sentence_transformers import SentenceTransformer
+from data.embedder import EmbeddingStoreMixin, get_embedding_model
+from data import fast_json
+from data.query_cache import QueryCache
+from data.process_usda_data import build_fdc_offset_index, iter_usda_foods, load_fdc_offset_index, save_fdc_offset_index
 
 
-class NutritionVectorStore:
-    def __init__(self, persist_directory: Path, embedding_model: str = "all-MiniLM-L6-v2", json_path: Optional[Path] = None):
+# Number of hits fetched first when adaptive search is enabled
+ADAPTIVE_INITIAL_RESULTS = 3
+
+# Embeddings are stored unit-length, so inner product distance (1 - cosine) needs no per-query normalization.
+# The HNSW buffer takes a whole ingest chunk per index update and the index is persisted once per ~10k
+# inserts instead of every 1000. Like the space, these only take effect when the collection is created.
+USDA_COLLECTION_METADATA = {
+    "description": "USDA FoodData Central nutrition information",
+    "hnsw:space": "ip",
+    "hnsw:batch_size": 1024,
+    "hnsw:sync_threshold": 10000
+}
+
+
+class NutritionVectorStore(EmbeddingStoreMixin):
+    def __init__(
+        self,
+        persist_directory: Path,
+        embedding_model: str = "all-MiniLM-L6-v2",
+        json_path: Optional[Path] = None,
+        index_path: Optional[Path] = None
+    ):
         """
         Initialize vector store for nutrition data.
         
@@ -16,13 +42,19 @@ class NutritionVectorStore:
             persist_directory: Where to store the vector database
             embedding_model: Sentence transformer model name (local, no API needed)
             json_path: Path to original USDA JSON file for loading full_data (optional)
+            index_path: Path to the FDC ID -> byte offset index (defaults to fdc_offsets.pkl next to json_path)
         """
         self.persist_directory = persist_directory
         self.persist_directory.mkdir(parents=True, exist_ok=True)
         
         # Store JSON path for loading full_data when needed
         self.json_path = json_path
+        self.index_path = index_path or (json_path.with_name("fdc_offsets.pkl") if json_path else None)
         self._food_data_cache = None  # Cache for loaded food data
+        self._food_offsets = None  # FDC ID -> (start, end) byte offsets in the JSON file
+        self._food_mmap = None  # Read-only memory map of the JSON file
+        self._search_cache = QueryCache()  # Formatted results by search parameters
+        self._embed_cache = QueryCache(ttl_seconds=None)  # Query text -> embedding (fixed per model)
         
         # Initialize ChromaDB
         self.client = chromadb.PersistentClient(
@@ -31,58 +63,130 @@ class NutritionVectorStore:
         )
         
         # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name="usda_nutrition",
-            metadata={"description": "USDA FoodData Central nutrition information"}
-        )
+        self._open_collection("usda_nutrition", USDA_COLLECTION_METADATA)
         
-        # Load embedding model (runs locally, no API needed)
-        print(f"Loading embedding model: {embedding_model}...")
-        self.embedding_model = SentenceTransformer(embedding_model)
-        print(f"✓ Loaded embedding model: {embedding_model}")
+        # Embedding model is loaded on first use (runs locally, no API needed)
+        self.embedding_model_name = embedding_model
     
-    def add_documents(self, documents: List[Dict]):
-        """Add documents to the vector store."""
-        texts = [doc['text'] for doc in documents]
-        ids = [doc['id'] for doc in documents]
-        metadatas = [doc['metadata'] for doc in documents]
-        
-        # Generate embeddings
-        print("Generating embeddings...")
-        embeddings = self.embedding_model.encode(texts, show_progress_bar=True)
-        
-        # Add to ChromaDB
-        self.collection.add(
-            embeddings=embeddings.tolist(),
-            documents=texts,
-            ids=ids,
-            metadatas=metadatas
-        )
-        print(f"✓ Added {len(documents)} documents to vector store")
+    @cached_property
+    def embedding_model(self) -> SentenceTransformer:
+        """Get the process-wide sentence transformer; shared by search and the tool's query cache."""
+        return get_embedding_model(self.embedding_model_name)
+    
+    def search(
+        self,
+        query: str,
+        n_results: int = 5,
+        query_embedding: Optional[np.ndarray] = None,
+        include_documents: bool = True,
+        margin_threshold: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Search for similar nutrition information, reusing a precomputed query embedding if given.
+        
+        If margin_threshold is set, a small first query is issued and returned as-is when
+        the top hit leads the runner-up by more than that margin in cosine distance; only
+        marginal result sets are re-queried with the full n_results.
+        
+        Results are cached by query and search parameters for a few minutes and
+        must be treated as read-only.
+        """
+        cache_key = (query, n_results, include_documents, margin_threshold)
+        results = self._search_cache.get(cache_key)
+        if results is None:
+            results = self._search(query, n_results, query_embedding, include_documents, margin_threshold)
+            self._search_cache.put(cache_key, results)
+        return results
+    
+    def _search(
+        self,
+        query: str,
+        n_results: int,
+        query_embedding: Optional[np.ndarray],
+        include_documents: bool,
+        margin_threshold: Optional[float]
+    ) -> List[Dict]:
+        """Run an uncached search (see search)."""
+        if query_embedding is None:
+            query_embedding = self.embed_query(query)
+        
+        if margin_threshold is not None and n_results > ADAPTIVE_INITIAL_RESULTS:
+            initial = self._search(query, ADAPTIVE_INITIAL_RESULTS, query_embedding, include_documents, None)
+            # Fewer hits than asked means the collection is exhausted anyway
+            if len(initial) < ADAPTIVE_INITIAL_RESULTS:
+                return initial
+            lead = initial[1]['distance'] - initial[0]['distance']
+            if self.distance_space == "l2":
+                lead /= 2  # Squared L2 between unit vectors is twice the cosine distance
+            if lead > margin_threshold:
+                return initial
+        
+        return self._query([query_embedding], n_results, include_documents)[0]
     
-    def search(self, query: str, n_results: int = 5) -> List[Dict]:
-        """Search for similar nutrition information."""
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode([query])[0]
+    def search_batch(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        query_embeddings: Optional[List[np.ndarray]] = None,
+        include_documents: bool = True
+    ) -> List[List[Dict]]:
+        """
+        Search for several queries with one embedding pass and one Chroma query.
+        
+        Queries with cached results are answered from the search cache; only the
+        rest are embedded and sent to Chroma. Only metadata and distances are fetched
+        unless include_documents is set; embeddings are never returned. Results
+        without documents have text None.
+        """
+        if not queries:
+            return []
         
-        # Search
+        cache_keys = [(query, n_results, include_documents, None) for query in queries]
+        all_results, missing = self._cached_searches(queries, cache_keys)
+        if not missing:
+            return all_results
+        
+        # Generate all missing query embeddings in a single forward pass
+        if query_embeddings is None:
+            miss_embeddings = self.embed_queries(list(missing))
+        else:
+            miss_embeddings = [query_embeddings[positions[0]] for positions in missing.values()]
+        
+        self._store_searches(
+            all_results, missing, cache_keys, self._query(miss_embeddings, n_results, include_documents)
+        )
+        return all_results
+    
+    def _query(
+        self,
+        query_embeddings: List[np.ndarray],
+        n_results: int,
+        include_documents: bool
+    ) -> List[List[Dict]]:
+        """Query Chroma with one or more embeddings and format the hits per query."""
+        # Search (Chroma accepts multiple query embeddings at once)
+        include = ["metadatas", "distances"] + (["documents"] if include_documents else [])
         results = self.collection.query(
-            query_embeddings=[query_embedding.tolist()],
-            n_results=n_results
+            query_embeddings=np.asarray(query_embeddings, dtype=np.float32),
+            n_results=n_results,
+            include=include
         )
         
-        # Format results
-        formatted_results = []
-        if results['ids'] and len(results['ids'][0]) > 0:
-            for i in range(len(results['ids'][0])):
-                formatted_results.append({
-                    'id': results['ids'][0][i],
-                    'text': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i],
-                    'distance': results['distances'][0][i] if 'distances' in results and results['distances'] else None
-                })
-        
-        return formatted_results
+        # Format results per query
+        all_results = []
+        for q in range(len(query_embeddings)):
+            formatted_results = []
+            if results['ids'] and len(results['ids'][q]) > 0:
+                for i in range(len(results['ids'][q])):
+                    formatted_results.append({
+                        'id': results['ids'][q][i],
+                        'text': results['documents'][q][i] if include_documents else None,
+                        'metadata': results['metadatas'][q][i],
+                        'distance': results['distances'][q][i] if 'distances' in results and results['distances'] else None
+                    })
+            all_results.append(formatted_results)
+        
+        return all_results
     
     def _load_food_data_cache(self):
         """Lazy load food data from JSON file."""
@@ -91,25 +195,82 @@ class NutritionVectorStore:
         
         if self.json_path and self.json_path.exists():
             try:
-                with open(self.json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    foods = data.get('FoundationFoods', [])
-                    # Create a lookup dictionary by FDC ID
-                    self._food_data_cache = {str(food.get('fdcId')): food for food in foods}
+                # Create a lookup dictionary by FDC ID without holding the parsed file alongside it
+                self._food_data_cache = {str(food.get('fdcId')): food for food in iter_usda_foods(self.json_path)}
             except Exception as e:
                 print(f"Warning: Could not load food data cache: {e}")
                 self._food_data_cache = {}
         else:
             self._food_data_cache = {}
     
+    def _load_food_index(self):
+        """Lazy load the offset index and memory-map the JSON file for random access."""
+        if self._food_offsets is not None:
+            return
+        
+        if not (self.json_path and self.json_path.exists() and self.json_path.stat().st_size > 0):
+            self._food_offsets = {}
+            return
+        
+        try:
+            offsets = load_fdc_offset_index(self.json_path, self.index_path)
+            if offsets is None:
+                # Build once and persist so later processes skip the scan
+                offsets = build_fdc_offset_index(self.json_path)
+                try:
+                    save_fdc_offset_index(offsets, self.json_path, self.index_path)
+                except OSError as e:
+                    print(f"Warning: Could not save FDC offset index: {e}")
+            
+            with open(self.json_path, 'rb') as f:
+                self._food_mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._food_offsets = offsets
+        except Exception as e:
+            print(f"Warning: Could not load FDC offset index: {e}")
+            self._food_offsets = {}
+    
     def get_food_by_id(self, fdc_id: str) -> Optional[Dict]:
         """Retrieve full food data by FDC ID from the original JSON file."""
-        # Load from cache (original JSON file)
+        # Parse just this record from the memory-mapped file
+        self._load_food_index()
+        if self._food_mmap is not None:
+            span = self._food_offsets.get(str(fdc_id))
+            if span is None:
+                return None
+            start, end = span
+            return fast_json.loads(self._food_mmap[start:end])
+        
+        # Fall back to loading the whole file into the cache
         self._load_food_data_cache()
         if self._food_data_cache and str(fdc_id) in self._food_data_cache:
             return self._food_data_cache[str(fdc_id)]
         return None
     
+    def get_foods_by_ids(self, fdc_ids: List) -> Dict:
+        """Retrieve full food data for several FDC IDs at once, keyed by the given IDs."""
+        self._load_food_index()
+        if self._food_mmap is None:
+            return {fdc_id: self.get_food_by_id(fdc_id) for fdc_id in fdc_ids}
+        
+        # Read records in file order so the memory map is walked sequentially
+        spans = [(self._food_offsets.get(str(fdc_id)), fdc_id) for fdc_id in dict.fromkeys(fdc_ids)]
+        foods = {fdc_id: None for _, fdc_id in spans}
+        for (start, end), fdc_id in sorted((span, fdc_id) for span, fdc_id in spans if span is not None):
+            foods[fdc_id] = fast_json.loads(self._food_mmap[start:end])
+        return foods
+    
+    def warm_up(self):
+        """Load the food index and run one embedding pass so the first search skips this setup."""
+        self._load_food_index()
+        self.embedding_model.encode(["warm up"], normalize_embeddings=True)
+    
+    def get_cache_stats(self) -> Dict[str, Dict]:
+        """Get hit/miss statistics for the search result and query embedding caches."""
+        return {
+            'search': self._search_cache.stats(),
+            'embeddings': self._embed_cache.stats()
+        }
+    
     def get_collection_count(self) -> int:
         """Get the number of documents in the collection."""
         return self.collection.count()
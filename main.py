@@ -4,31 +4,65 @@ Main Entry Point
 """
 
 import asyncio
+import sys
+from typing import TYPE_CHECKING
 
 from config import AppConfig
-from agents.advisor_agent import NutritionAdvisorAgent
-from spoon_ai.chat import ChatBot
 
+# The agent stack (spoon_ai, chromadb, sentence-transformers) is imported in main()
+# after the configuration check, so startup output appears before the slow imports
+# and a missing dependency reaches its ImportError handler
+if TYPE_CHECKING:
+    from agents.advisor_agent import NutritionAdvisorAgent
 
-async def run_conversation_loop(agent: NutritionAdvisorAgent):
+try:
+    from prompt_toolkit import PromptSession  # Optional: native async prompt with line editing
+except ImportError:
+    PromptSession = None
+
+
+WELCOME_BANNER = (
+    "\n" + "="*60 + "\n"
+    "Welcome to the Nutrition-Based Local Food Advisor!\n"
+    + "="*60 + "\n"
+    "Type 'exit' or 'quit' to end the conversation.\n\n"
+)
+
+
+def warm_up_vector_stores():
+    """Build the lazily loaded search state of both vector stores ahead of the first lookup."""
+    from agents.tools.dietary_requirements_tool import get_default_vector_store
+    from agents.tools.nutrition_lookup_tool import get_default_vector_store as get_nutrition_vector_store
+    
+    try:
+        get_nutrition_vector_store().warm_up()
+        get_default_vector_store().warm_up()
+    except Exception as e:
+        print(f"Warning: Could not warm up vector stores: {e}")
+
+
+async def run_conversation_loop(agent: "NutritionAdvisorAgent"):
     """
     Main conversation loop for user interaction.
     
     Args:
         agent: The primary agent instance
     """
-    print("\n" + "="*60)
-    print("Welcome to the Nutrition-Based Local Food Advisor!")
-    print("="*60)
-    print("Type 'exit' or 'quit' to end the conversation.\n")
+    sys.stdout.write(WELCOME_BANNER)
+    sys.stdout.flush()
     
     # Reset the agent state
     agent.clear()
     
+    # Read input without blocking the event loop, natively if prompt_toolkit is installed
+    session = PromptSession() if PromptSession is not None else None
+    
     while True:
         try:
-            # Get user input
-            user_input = input("You: ").strip()
+            if session is not None:
+                user_input = (await session.prompt_async("You: ")).strip()
+            else:
+                user_input = (await asyncio.to_thread(input, "You: ")).strip()
             
             # Check for exit commands
             if user_input.lower() in ['exit', 'quit', 'bye']:
@@ -39,11 +73,13 @@ async def run_conversation_loop(agent: NutritionAdvisorAgent):
                 continue
             
             # Process user input through agent
-            print("\n🤖 Agent is processing your request...")
+            sys.stdout.write("\n🤖 Agent is processing your request...\n")
+            sys.stdout.flush()
             response = await agent.run(user_input)
-            print(f"\n📋 Nutrition Advisor: {response}\n")
+            sys.stdout.write(f"\n📋 Nutrition Advisor: {response}\n\n")
+            sys.stdout.flush()
             
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
             print("\n\nConversation interrupted. Goodbye!")
             break
         except Exception as e:
@@ -60,20 +96,35 @@ async def main():
         # Validate configuration
         AppConfig.validate()
         
-        # Create the primary agent with LLM configuration
-        agent = NutritionAdvisorAgent(
-            llm=ChatBot(
+        # Deferred heavy imports; an ImportError here is reported below
+        from agents.advisor_agent import NutritionAdvisorAgent
+        from agents.tools.dietary_requirements_tool import get_default_vector_store
+        from spoon_ai.chat import ChatBot
+        
+        # Build the LLM client and warm the shared dietary vector store
+        # concurrently so the embedding model load overlaps client setup
+        llm, _ = await asyncio.gather(
+            asyncio.to_thread(
+                ChatBot,
                 llm_provider=AppConfig.DEFAULT_LLM_PROVIDER,
                 model=AppConfig.DEFAULT_LLM_MODEL
-            )
+            ),
+            asyncio.to_thread(get_default_vector_store)
         )
         
+        # Create the primary agent with LLM configuration
+        agent = NutritionAdvisorAgent(llm=llm)
+        
+        # Finish loading search state in the background while the user types
+        warm_up_task = asyncio.create_task(asyncio.to_thread(warm_up_vector_stores))
+        
         print("✓ Agent initialized successfully!")
         print("✓ Using default LLM provider:", AppConfig.DEFAULT_LLM_PROVIDER)
         print("✓ Using default LLM model:", AppConfig.DEFAULT_LLM_MODEL)
         
         # Start conversation loop
         await run_conversation_loop(agent)
+        await warm_up_task  # Worker threads are joined on exit anyway
         
     except ImportError as e:
         print(f"Error: {e}")
@@ -0,0 +1,28 @@
+"""Build the FDC ID -> byte offset index for the USDA FoodData Central JSON file."""
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data.process_usda_data import build_fdc_offset_index, save_fdc_offset_index
+
+
+def build_fdc_index(data_dir: Path) -> bool:
+    """Scan the USDA JSON once and save fdc_offsets.pkl next to it."""
+    json_path = data_dir / "FoodData_Central_foundation_food_json_2025-04-24.json"
+    index_path = data_dir / "fdc_offsets.pkl"
+    
+    if not json_path.exists():
+        print(f"⚠ USDA JSON file not found at {json_path}")
+        return False
+    
+    print("Building FDC offset index...")
+    offsets = build_fdc_offset_index(json_path)
+    save_fdc_offset_index(offsets, json_path, index_path)
+    print(f"✓ Indexed {len(offsets)} food records to {index_path}")
+    return True
+
+
+if __name__ == "__main__":
+    build_fdc_index(Path(__file__).parent.parent / "data")
@@ -1,16 +1,42 @@
 """Setup script for RAG system with USDA data and dietary requirements."""
 from pathlib import Path
+from typing import List
+import json
 import sys
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from data.vector_store import NutritionVectorStore
-from data.process_usda_data import process_all_foods
-from data.dietary_vector_store import DietaryRequirementsVectorStore
+from data.vector_store import NutritionVectorStore, USDA_COLLECTION_METADATA
+from data.process_usda_data import process_all_foods, build_fdc_offset_index, save_fdc_offset_index
+from data.dietary_vector_store import DietaryRequirementsVectorStore, DIETARY_COLLECTION_METADATA
 from data.process_dietary_data import process_all_dietary_data
 
 
+# Written into each vector DB directory after a successful index
+FINGERPRINT_FILE = ".fingerprint"
+
+
+def source_fingerprint(paths: List[Path]) -> List[List]:
+    """Identify the current version of the source files by name, mtime and size."""
+    return [[path.name, path.stat().st_mtime_ns, path.stat().st_size] for path in paths]
+
+
+def is_index_current(vector_store_path: Path, paths: List[Path], count: int) -> bool:
+    """Check whether the collection was built from the current sources and is complete."""
+    try:
+        saved = json.loads((vector_store_path / FINGERPRINT_FILE).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return False
+    return count > 0 and saved.get('count') == count and saved.get('sources') == source_fingerprint(paths)
+
+
+def save_fingerprint(vector_store_path: Path, paths: List[Path], count: int):
+    """Record the sources and document count the collection was built from."""
+    fingerprint = {'sources': source_fingerprint(paths), 'count': count}
+    (vector_store_path / FINGERPRINT_FILE).write_text(json.dumps(fingerprint), encoding='utf-8')
+
+
 def setup_usda_rag(data_dir: Path, reindex: bool = False) -> bool:
     """Setup RAG system with USDA food data."""
     print("\n" + "="*60)
@@ -24,16 +50,26 @@ def setup_usda_rag(data_dir: Path, reindex: bool = False) -> bool:
         print("Skipping USDA data setup.")
         return False
     
+    print("Initializing vector store...")
+    vector_store_path = data_dir / "vector_db"
+    vector_store = NutritionVectorStore(vector_store_path, json_path=json_path)
+    
+    # Skip processing and embedding entirely when nothing changed since the last index
+    existing_count = vector_store.get_collection_count()
+    if not reindex and is_index_current(vector_store_path, [json_path], existing_count):
+        print(f"✓ Collection is up to date with {existing_count} documents. Skipping USDA re-indexing.")
+        return False
+    
     print("Processing USDA data...")
     documents = process_all_foods(json_path)
     print(f"✓ Processed {len(documents)} food items")
     
-    print("Initializing vector store...")
-    vector_store_path = data_dir / "vector_db"
-    vector_store = NutritionVectorStore(vector_store_path, json_path=json_path)
+    print("Building FDC offset index...")
+    offsets = build_fdc_offset_index(json_path)
+    save_fdc_offset_index(offsets, json_path, data_dir / "fdc_offsets.pkl")
+    print(f"✓ Indexed {len(offsets)} food records for fast lookup")
     
     # Check if collection already has data
-    existing_count = vector_store.get_collection_count()
     if existing_count > 0:
         if not reindex:
             print(f"⚠ Collection already has {existing_count} documents.")
@@ -42,16 +78,13 @@ def setup_usda_rag(data_dir: Path, reindex: bool = False) -> bool:
                 print("Skipping USDA re-indexing.")
                 return False
         # Clear existing collection
-        vector_store.client.delete_collection("usda_nutrition")
-        vector_store.collection = vector_store.client.get_or_create_collection(
-            name="usda_nutrition",
-            metadata={"description": "USDA FoodData Central nutrition information"}
-        )
+        vector_store.recreate_collection("usda_nutrition", USDA_COLLECTION_METADATA)
     
     print("Adding documents to vector store...")
     vector_store.add_documents(documents)
     
     final_count = vector_store.get_collection_count()
+    save_fingerprint(vector_store_path, [json_path], final_count)
     print(f"✓ USDA RAG setup complete! Indexed {final_count} food items.")
     return True
 
@@ -80,9 +113,7 @@ def setup_dietary_rag(data_dir: Path, reindex: bool = False) -> bool:
         print("Skipping dietary requirements setup.")
         return False
     
-    print("Processing dietary requirements data...")
-    documents = process_all_dietary_data(mineral_path, vitamin_path, nutrition_path)
-    print(f"✓ Processed {len(documents)} documents")
+    source_paths = [mineral_path, vitamin_path, nutrition_path]
     
     print("Initializing vector store...")
     vector_store_path = data_dir / "dietary_vector_db"
@@ -93,8 +124,17 @@ def setup_dietary_rag(data_dir: Path, reindex: bool = False) -> bool:
         nutrition_path=nutrition_path
     )
     
-    # Check if collection already has data
+    # Skip processing and embedding entirely when nothing changed since the last index
     existing_count = vector_store.get_collection_count()
+    if not reindex and is_index_current(vector_store_path, source_paths, existing_count):
+        print(f"✓ Collection is up to date with {existing_count} documents. Skipping dietary requirements re-indexing.")
+        return False
+    
+    print("Processing dietary requirements data...")
+    documents = process_all_dietary_data(mineral_path, vitamin_path, nutrition_path)
+    print(f"✓ Processed {len(documents)} documents")
+    
+    # Check if collection already has data
     if existing_count > 0:
         if not reindex:
             print(f"⚠ Collection already has {existing_count} documents.")
@@ -103,16 +143,13 @@ def setup_dietary_rag(data_dir: Path, reindex: bool = False) -> bool:
                 print("Skipping dietary requirements re-indexing.")
                 return False
         # Clear existing collection
-        vector_store.client.delete_collection("dietary_requirements")
-        vector_store.collection = vector_store.client.get_or_create_collection(
-            name="dietary_requirements",
-            metadata={"description": "Dietary requirements: minerals, vitamins, and nutrition recommendations"}
-        )
+        vector_store.recreate_collection("dietary_requirements", DIETARY_COLLECTION_METADATA)
     
     print("Adding documents to vector store...")
     vector_store.add_documents(documents)
     
     final_count = vector_store.get_collection_count()
+    save_fingerprint(vector_store_path, source_paths, final_count)
     print(f"✓ Dietary Requirements RAG setup complete! Indexed {final_count} documents.")
     return True
 
@@ -0,0 +1,28 @@
+"""Tests for the on-disk document embedding cache."""
+import hashlib
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+from data.embedder import EmbeddingDiskCache
+
+
+def test_keys_ending_in_nul_survive_a_reload(tmp_path):
+    # Find texts whose digest ends in a NUL byte, which 'S' arrays would strip
+    texts = [
+        text for text in (f"food {i}" for i in range(5000))
+        if hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest().endswith(b"\0")
+    ][:3]
+    assert texts
+    path = tmp_path / "embeddings.npz"
+    cache = EmbeddingDiskCache(path)
+    for i, text in enumerate(texts):
+        cache.put(text, np.full(4, i, dtype=np.float32))
+    cache.save()
+
+    reloaded = EmbeddingDiskCache(path)
+    for i, text in enumerate(texts):
+        np.testing.assert_array_equal(reloaded.get(text), np.full(4, i, dtype=np.float32))
@@ -0,0 +1,37 @@
+"""Tests for nutrition lookup result formatting."""
+import pytest
+
+pytest.importorskip("spoon_ai")
+pytest.importorskip("chromadb")
+
+from agents.tools.nutrition_lookup_tool import NutritionLookupTool
+
+
+def nutrient(name: str, amount: float, unit: str) -> dict:
+    return {'nutrient': {'name': name, 'unitName': unit}, 'amount': amount}
+
+
+def test_energy_reported_in_kcal_when_listed_twice():
+    tool = NutritionLookupTool(vector_store=object())
+    full_data = {'foodNutrients': [
+        nutrient('Energy', 960, 'kJ'),
+        nutrient('Protein', 20.1, 'g'),
+        nutrient('Energy', 229, 'kcal'),
+    ]}
+
+    _, _, key_nutrients = tool._format_hit({'fdc_id': 1, 'description': 'Egg'}, full_data)
+
+    assert key_nutrients == "Calories: 229 kcal, Protein: 20.1 g"
+
+
+def test_repeated_extra_nutrient_listed_once():
+    tool = NutritionLookupTool(vector_store=object())
+    full_data = {'foodNutrients': [
+        nutrient('Water', 70.1, 'g'),
+        nutrient('Ash', 1.2, 'g'),
+        nutrient('Water', 70.3, 'g'),
+    ]}
+
+    _, _, key_nutrients = tool._format_hit({'fdc_id': 2, 'description': 'Pear'}, full_data)
+
+    assert key_nutrients == "Water: 70.3 g, Ash: 1.2 g"
@@ -0,0 +1,21 @@
+"""Tests for dietary data processing helpers."""
+from data.process_dietary_data import get_age_group
+
+
+def test_get_age_group_integer_ages():
+    assert get_age_group(1) == "1"
+    assert get_age_group(3) == "2-3"
+    assert get_age_group(18) == "15-18"
+    assert get_age_group(19) == "19-64"
+    assert get_age_group(74) == "65-74"
+    assert get_age_group(75) == "75+"
+    assert get_age_group(130) == "75+"
+
+
+def test_get_age_group_float_ages():
+    assert get_age_group(30.0) == "19-64"
+    assert get_age_group(25.5) == "19-64"
+    assert get_age_group(2.5) == "2-3"
+    # Fractional ages are floored, so ages between two ranges stay in the lower one
+    assert get_age_group(18.5) == "15-18"
+    assert get_age_group(64.5) == "19-64"
@@ -0,0 +1,32 @@
+"""Tests for the persisted FDC ID -> byte offset index."""
+import os
+
+from data.process_usda_data import build_fdc_offset_index, load_fdc_offset_index, save_fdc_offset_index
+
+
+def write_foods(path, *fdc_ids):
+    records = ", ".join(f'{{"fdcId": {fdc_id}, "description": "food {fdc_id}"}}' for fdc_id in fdc_ids)
+    path.write_text(f'{{"FoundationFoods": [{records}]}}', encoding='utf-8')
+
+
+def test_offset_index_round_trip(tmp_path):
+    json_path, index_path = tmp_path / "foods.json", tmp_path / "fdc_offsets.pkl"
+    write_foods(json_path, 11, 22)
+    offsets = build_fdc_offset_index(json_path)
+    save_fdc_offset_index(offsets, json_path, index_path)
+
+    assert load_fdc_offset_index(json_path, index_path) == offsets
+
+
+def test_same_size_edit_invalidates_offset_index(tmp_path):
+    json_path, index_path = tmp_path / "foods.json", tmp_path / "fdc_offsets.pkl"
+    write_foods(json_path, 11, 22)
+    save_fdc_offset_index(build_fdc_offset_index(json_path), json_path, index_path)
+
+    # Swap the records: same size, different offsets per FDC ID
+    stat = json_path.stat()
+    write_foods(json_path, 22, 11)
+    os.utime(json_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert json_path.stat().st_size == stat.st_size
+
+    assert load_fdc_offset_index(json_path, index_path) is None
@@ -0,0 +1,71 @@
+"""Tests for the LRU/TTL query cache."""
+from data import query_cache
+from data.query_cache import QueryCache
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(query_cache.time, "monotonic", clock)
+    cache = QueryCache(ttl_seconds=10)
+    cache.put("apple", [1])
+
+    clock.now += 9.9
+    assert cache.get("apple") == [1]
+
+    clock.now += 0.2
+    assert cache.get("apple") is None
+    assert cache.stats()["size"] == 0  # Expired entries are dropped on lookup
+
+
+def test_no_ttl_never_expires(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(query_cache.time, "monotonic", clock)
+    cache = QueryCache(ttl_seconds=None)
+    cache.put("apple", [1])
+
+    clock.now += 1e9
+    assert cache.get("apple") == [1]
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(max_size=2)
+    cache.put("apple", 1)
+    cache.put("pear", 2)
+    cache.get("apple")  # pear is now least recently used
+    cache.put("kiwi", 3)
+
+    assert cache.get("pear") is None
+    assert cache.get("apple") == 1
+    assert cache.get("kiwi") == 3
+
+
+def test_stats_count_hits_and_misses():
+    cache = QueryCache()
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'size': 0}
+
+    cache.put("apple", 1)
+    cache.get("apple")
+    cache.get("apple")
+    cache.get("pear")
+
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3, 'size': 1}
+
+
+def test_clear_keeps_stats():
+    cache = QueryCache()
+    cache.put("apple", 1)
+    cache.get("apple")
+    cache.clear()
+
+    assert cache.get("apple") is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'size': 0}
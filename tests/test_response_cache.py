@@ -0,0 +1,98 @@
+"""Tests for the SQLite response cache."""
+import asyncio
+
+from data import response_cache
+from data.response_cache import ResponseCache
+
+
+class FakeClock:
+    """Stand-in for time.time that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    cache.set("key", "value", ttl=60)
+
+    clock.now += 59
+    assert cache.get("key") == "value"
+
+    clock.now += 1
+    assert cache.get("key") is None
+
+
+def test_purge_expired_keeps_live_entries(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    cache.set("short", "a", ttl=10)
+    cache.set("long", "b", ttl=100)
+
+    clock.now += 50
+    cache.purge_expired()
+    clock.now -= 50  # An expired row that was purged stays gone
+
+    assert cache.get("short") is None
+    assert cache.get("long") == "b"
+
+
+def test_entries_persist_across_instances(tmp_path):
+    ResponseCache(tmp_path / "cache.sqlite3").set("key", "value", ttl=60)
+    assert ResponseCache(tmp_path / "cache.sqlite3").get("key") == "value"
+
+
+def test_make_key_separates_parameters():
+    assert ResponseCache.make_key("tavily", "apple", 5) == ResponseCache.make_key("tavily", "apple", 5)
+    assert ResponseCache.make_key("tavily", "apple", 5) != ResponseCache.make_key("tavily", "apple", 10)
+    assert ResponseCache.make_key("tavily", "ab", "c") != ResponseCache.make_key("tavily", "a", "bc")
+
+
+def test_cached_get_fetches_once(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return "fresh"
+
+    assert asyncio.run(cache.cached_get("key", 60, fetch)) == "fresh"
+    assert asyncio.run(cache.cached_get("key", 60, fetch)) == "fresh"
+    assert len(calls) == 1
+
+
+def test_cached_get_does_not_cache_none(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return None
+
+    assert asyncio.run(cache.cached_get("key", 60, fetch)) is None
+    assert asyncio.run(cache.cached_get("key", 60, fetch)) is None
+    assert len(calls) == 2
+
+
+def test_default_cache_purges_expired_rows(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    monkeypatch.setattr(response_cache, "__file__", str(tmp_path / "response_cache.py"))
+    db_path = tmp_path / "response_cache.sqlite3"
+    ResponseCache(db_path).set("stale", "a", ttl=10)
+    clock.now += 50
+
+    response_cache.get_default_response_cache.cache_clear()
+    try:
+        cache = response_cache.get_default_response_cache()
+        rows = cache._conn.execute("SELECT key FROM responses").fetchall()
+    finally:
+        response_cache.get_default_response_cache.cache_clear()
+
+    assert rows == []
@@ -0,0 +1,82 @@
+"""Tests for the similarity-keyed query cache."""
+import numpy as np
+
+from data.semantic_cache import SemanticQueryCache, normalize_query
+
+
+def unit(index: int, dim: int = 4) -> np.ndarray:
+    """Return the index-th basis vector, orthogonal to every other one."""
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+
+def test_normalize_query():
+    assert normalize_query("  Greek   YOGURT \n") == "greek yogurt"
+
+
+def test_similar_embedding_hits_and_dissimilar_misses():
+    cache = SemanticQueryCache(capacity=4, threshold=0.95)
+    cache.put(unit(0), "apple")
+
+    assert cache.get(unit(0) * 3) == "apple"  # Scale does not matter
+    assert cache.get(unit(1)) is None
+
+
+def test_tags_are_isolated():
+    cache = SemanticQueryCache(capacity=4)
+    cache.put(unit(0), "five results", tag=5, text="apple")
+
+    assert cache.get(unit(0), tag=10) is None
+    assert cache.get_exact("apple", tag=10) is None
+    assert cache.get(unit(0), tag=5) == "five results"
+    assert cache.get_exact("apple", tag=5) == "five results"
+
+
+def test_same_text_with_different_tags_keeps_both():
+    cache = SemanticQueryCache(capacity=4)
+    cache.put(unit(0), "five", tag=5, text="apple")
+    cache.put(unit(0), "ten", tag=10, text="apple")
+
+    assert cache.get_exact("apple", tag=5) == "five"
+    assert cache.get_exact("apple", tag=10) == "ten"
+
+
+def test_eviction_drops_stale_exact_key():
+    cache = SemanticQueryCache(capacity=2)
+    cache.put(unit(0), "apple", text="apple")
+    cache.put(unit(1), "pear", text="pear")
+    cache.get_exact("pear")  # apple is now least recently used
+    cache.put(unit(2), "kiwi", text="kiwi")
+
+    assert cache.get_exact("apple") is None
+    assert cache.get(unit(0)) is None
+    assert cache.get_exact("pear") == "pear"
+    assert cache.get_exact("kiwi") == "kiwi"
+
+
+def test_reputting_same_text_reuses_its_slot():
+    cache = SemanticQueryCache(capacity=2)
+    cache.put(unit(0), "old", text="apple")
+    cache.put(unit(0), "new", text="apple")
+    cache.put(unit(1), "pear", text="pear")
+
+    # The re-put did not take a second slot, so nothing has been evicted yet
+    assert cache.get_exact("apple") == "new"
+    assert cache.get(unit(0)) == "new"
+    assert cache.get_exact("pear") == "pear"
+
+    # Evicting apple's slot later must not leave a dangling exact key
+    cache.get_exact("pear")
+    cache.put(unit(2), "kiwi", text="kiwi")
+    assert cache.get_exact("apple") is None
+    assert cache.get_exact("pear") == "pear"
+
+
+def test_clear():
+    cache = SemanticQueryCache(capacity=2)
+    cache.put(unit(0), "apple", text="apple")
+    cache.clear()
+
+    assert cache.get_exact("apple") is None
+    assert cache.get(unit(0)) is None
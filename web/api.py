@@ -2,27 +2,98 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
+import asyncio
+import os
 import sys
+import uuid
+from collections import OrderedDict
 from pathlib import Path
-from elevenlabs.client import ElevenLabs
-import asyncio
-from fastapi.responses import StreamingResponse
+from elevenlabs.client import AsyncElevenLabs
+from fastapi.responses import Response, StreamingResponse
+import hashlib
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import AppConfig
 from agents.advisor_agent import NutritionAdvisorAgent
+from data import fast_json
+from data.query_cache import QueryCache
 from spoon_ai.chat import ChatBot
 
 
-# Global agent instance
+# Media type served for each ElevenLabs output format
+TTS_MEDIA_TYPES = {
+    "mp3_44100_128": "audio/mpeg",
+    "mp3_22050_32": "audio/mpeg",
+    "mp3_44100_192": "audio/mpeg",
+    "pcm_16000": "audio/pcm",
+    "pcm_22050": "audio/pcm",
+    "pcm_24000": "audio/pcm",
+    "pcm_44100": "audio/pcm"
+}
+
+# Synthesized audio for short texts (greetings, error messages) is kept in
+# memory; ~30 s of mp3 per entry bounds the cache to tens of MB
+TTS_CACHE_MAX_TEXT = 500
+tts_cache = QueryCache(max_size=128, ttl_seconds=None)
+
+# Comma-separated origins allowed to call the API cross-origin; the bundled web UI
+# is served from this app, so by default no CORS handling runs at all
+CORS_ORIGINS = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "").split(",") if origin.strip()]
+
+# orjson is optional; FastAPI releases that serialize response models through
+# Pydantic themselves deprecate ORJSONResponse, so it is only used on older ones
+USE_ORJSON_RESPONSE = fast_json.orjson is not None and not hasattr(ORJSONResponse, "__deprecated__")
+
+# Page served when templates/index.html is missing
+FALLBACK_INDEX_HTML = b"""
+    <html>
+        <head><title>Nutrition Advisor</title></head>
+        <body>
+            <h1>Nutrition Advisor API</h1>
+            <p>API is running. Use /docs for API documentation.</p>
+        </body>
+    </html>
+    """
+
+# Conversations kept in memory; the least recently used one is dropped beyond this
+MAX_CHAT_SESSIONS = 1000
+
+# Global agent instance; its LLM client and tools are shared by the per-session agents
 agent: Optional[NutritionAdvisorAgent] = None
-elevenlabs_client: Optional[ElevenLabs] = None
+sessions: "OrderedDict[str, NutritionAdvisorAgent]" = OrderedDict()
+elevenlabs_client: Optional[AsyncElevenLabs] = None
+
+
+def get_session_agent(session_id: str) -> NutritionAdvisorAgent:
+    """Return the agent holding a session's conversation, creating it on first use."""
+    session_agent = sessions.get(session_id)
+    if session_agent is None:
+        session_agent = sessions[session_id] = NutritionAdvisorAgent(
+            llm=agent.llm,
+            available_tools=agent.available_tools
+        )
+        if len(sessions) > MAX_CHAT_SESSIONS:
+            sessions.popitem(last=False)
+    else:
+        sessions.move_to_end(session_id)
+    return session_agent
+
+
+async def warm_up_elevenlabs(client: AsyncElevenLabs):
+    """Open the client's keep-alive connection so the first TTS request skips the TLS handshake."""
+    try:
+        # Any cheap authenticated call works; the connection is pooled even if the key may not list voices
+        await asyncio.wait_for(client.voices.get_all(), timeout=5)
+    except Exception as e:
+        print(f"Warning: Could not warm up ElevenLabs connection: {e}")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -30,6 +101,15 @@ async def lifespan(app: FastAPI):
     # Startup
     global agent
     global elevenlabs_client
+    
+    # Read the page once instead of on every request (restart to pick up edits)
+    html_file = Path(__file__).parent / "templates" / "index.html"
+    app.state.index_html = html_file.read_bytes() if html_file.exists() else FALLBACK_INDEX_HTML
+    
+    # Bound concurrent upstream calls to what the LLM provider and ElevenLabs plan allow
+    app.state.llm_semaphore = asyncio.Semaphore(AppConfig.LLM_MAX_CONCURRENCY)
+    app.state.tts_semaphore = asyncio.Semaphore(AppConfig.ELEVENLABS_MAX_CONCURRENCY)
+    
     try:
         AppConfig.validate()
         agent = NutritionAdvisorAgent(
@@ -40,7 +120,8 @@ async def lifespan(app: FastAPI):
         )
         try:
             if AppConfig.ELEVENLABS_API_KEY:
-                elevenlabs_client = ElevenLabs(api_key=AppConfig.ELEVENLABS_API_KEY)
+                elevenlabs_client = AsyncElevenLabs(api_key=AppConfig.ELEVENLABS_API_KEY)
+                await warm_up_elevenlabs(elevenlabs_client)
                 print("✓ ElevenLabs client initialized successfully")
             else:
                 elevenlabs_client = None
@@ -59,17 +140,33 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title="Nutrition Advisor API",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if USE_ORJSON_RESPONSE else JSONResponse
 )
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+
+class TextGZipMiddleware(GZipMiddleware):
+    """GZip middleware that leaves the already compressed TTS audio untouched."""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/api/tts":
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compress chat replies, the page and static assets; a low level keeps CPU cost small
+app.add_middleware(TextGZipMiddleware, minimum_size=512, compresslevel=4)
+
+# CORS middleware, only for explicitly allowed origins
+if CORS_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["GET", "POST"],
+        allow_headers=["Content-Type"],
+    )
 
 
 class ChatMessage(BaseModel):
@@ -89,7 +186,7 @@ class UserProfile(BaseModel):
     dietary_restrictions: Optional[List[str]] = None
 
 class TTSRequest(BaseModel):
-    text: str
+    text: str = Field(max_length=5000)  # Checked during parsing, before the handler runs
     voice_id: Optional[str] = None
     model_id: Optional[str] = None
     output_format: Optional[str] = None
@@ -103,18 +200,8 @@ if static_path.exists():
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
     """Serve the main HTML page."""
-    html_file = Path(__file__).parent / "templates" / "index.html"
-    if html_file.exists():
-        return html_file.read_text()
-    return """
-    <html>
-        <head><title>Nutrition Advisor</title></head>
-        <body>
-            <h1>Nutrition Advisor API</h1>
-            <p>API is running. Use /docs for API documentation.</p>
-        </body>
-    </html>
-    """
+    # The page only changes with a deploy, so browsers may reuse it for a few minutes
+    return HTMLResponse(app.state.index_html, headers={"Cache-Control": "public, max-age=300"})
 
 
 @app.post("/api/chat", response_model=ChatResponse)
@@ -124,15 +211,14 @@ async def chat(message: ChatMessage):
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
     try:
-        # Clear agent state for new session if needed
-        if message.session_id is None or message.session_id == "new":
-            agent.clear()
-        
-        # Process message
-        response_text = await agent.run(message.message)
+        # Each session has its own conversation memory; no or "new" ID starts a fresh one
+        session_id = message.session_id
+        if session_id is None or session_id == "new":
+            session_id = uuid.uuid4().hex
         
-        # Generate session ID (simple implementation)
-        session_id = message.session_id or "session_1"
+        # Process message; excess requests wait here instead of overloading the LLM provider
+        async with app.state.llm_semaphore:
+            response_text = await get_session_agent(session_id).run(message.message)
         
         return ChatResponse(
             response=response_text,
@@ -150,8 +236,10 @@ async def update_profile(profile: UserProfile):
 
 
 @app.get("/api/health")
-async def health_check():
+async def health_check(response: Response):
     """Health check endpoint."""
+    # Lets browsers and proxies collapse bursts of probes into one request per second
+    response.headers["Cache-Control"] = "public, max-age=1"
     return {
         "status": "healthy",
         "agent_initialized": agent is not None
@@ -164,44 +252,18 @@ async def text_to_speech(request: TTSRequest):
     if elevenlabs_client is None:
         raise HTTPException(status_code=503, detail="ElevenLabs client not initialized")
     
-    # Validate input
-    if not request.text or not request.text.strip():
+    # Validate input (isspace checks without building a stripped copy)
+    if not request.text or request.text.isspace():
         raise HTTPException(status_code=400, detail="Text cannot be empty")
     
-    if len(request.text) > 5000:
-        raise HTTPException(status_code=400, detail="Text too long (max 5000 characters)")
-    
     try:
         # Calculate actual values with defaults
         actual_voice_id = request.voice_id or "JBFqnCBsd6RMkjVDRZzb"
         actual_model_id = request.model_id or "eleven_turbo_v2"
         actual_output_format = request.output_format or "mp3_44100_128"
         
-        # Convert text to speech
-        audio = await asyncio.to_thread(
-            elevenlabs_client.text_to_speech.convert,
-            text=request.text.strip(),
-            voice_id=actual_voice_id,
-            model_id=actual_model_id,
-            output_format=actual_output_format
-        )
-
         # Determine media type based on actual output format
-        media_type_map = {
-            "mp3_44100_128": "audio/mpeg",
-            "mp3_22050_32": "audio/mpeg",
-            "mp3_44100_192": "audio/mpeg",
-            "pcm_16000": "audio/pcm",
-            "pcm_22050": "audio/pcm",
-            "pcm_24000": "audio/pcm",
-            "pcm_44100": "audio/pcm"
-        }
-        media_type = media_type_map.get(actual_output_format, "audio/mpeg")
-
-        # Generator for streaming
-        def generate():
-            for chunk in audio:
-                yield chunk
+        media_type = TTS_MEDIA_TYPES.get(actual_output_format, "audio/mpeg")
         
         # Response headers
         headers = {
@@ -210,10 +272,53 @@ async def text_to_speech(request: TTSRequest):
             "Accept-Ranges": "bytes",
         }
         
+        text = request.text.strip()
+        cache_key = None
+        if len(text) <= TTS_CACHE_MAX_TEXT:
+            cache_key = hashlib.sha256(
+                f"{text}|{actual_voice_id}|{actual_model_id}|{actual_output_format}".encode('utf-8')
+            ).digest()
+            cached_audio = tts_cache.get(cache_key)
+            if cached_audio is not None:
+                return Response(content=cached_audio, media_type=media_type, headers={**headers, "X-Cache": "HIT"})
+        
+        # Stream the speech as it is synthesized rather than after the whole text
+        async def generate():
+            # Held for the whole stream, since ElevenLabs limits concurrent requests per plan
+            async with app.state.tts_semaphore:
+                audio = elevenlabs_client.text_to_speech.stream(
+                    text=text,
+                    voice_id=actual_voice_id,
+                    model_id=actual_model_id,
+                    output_format=actual_output_format
+                )
+                chunks = []
+                try:
+                    async for chunk in audio:
+                        chunks.append(chunk)
+                        yield chunk
+                finally:
+                    await audio.aclose()  # Release the upstream connection on disconnect
+            # Only reached when the whole stream was sent
+            if cache_key is not None and chunks:
+                tts_cache.put(cache_key, b"".join(chunks))
+        
+        # Wait for the first chunk so upstream errors still get an error status
+        audio_stream = generate()
+        first_chunk = await anext(audio_stream, b"")
+        
+        async def stream_response():
+            try:
+                yield first_chunk
+                async for chunk in audio_stream:
+                    yield chunk
+            finally:
+                await audio_stream.aclose()
+        
         return StreamingResponse(
-            generate(), 
+            stream_response(), 
             media_type=media_type, 
-            headers=headers,
+            headers={**headers, "X-Cache": "MISS"},
         )
     except HTTPException:
         raise  # Re-raise HTTP exceptions
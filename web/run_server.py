@@ -1,4 +1,5 @@
 """Run the web server."""
+import os
 import sys
 from pathlib import Path
 
@@ -7,13 +8,24 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import uvicorn
 
+
+# Restart on code changes; for development only (the reloader adds a watcher process)
+WEB_RELOAD = os.getenv("WEB_RELOAD", "").lower() in ("1", "true", "yes")
+
+# Server processes; each runs its own lifespan, so agent and embedding model load per worker
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1"))
+
 if __name__ == "__main__":
     # Use import string for reload to work properly
     uvicorn.run(
         "web.api:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,  # Auto-reload on code changes
+        reload=WEB_RELOAD,
+        workers=None if WEB_RELOAD else WEB_WORKERS,  # uvicorn cannot combine the two
+        # uvloop and httptools come with uvicorn[standard]; "auto" falls back to
+        # asyncio and h11 where they are unavailable (e.g. uvloop on Windows)
+        loop="auto",
+        http="auto",
         log_level="info"
     )
-